@@ -5,16 +5,22 @@ Works with any domain to find policy/help pages.
 """
 
 import asyncio
+import hashlib
+import heapq
 import json
 import logging
+import os
 import re
 import sys
+import tempfile
 import time
-from typing import List, Set, Dict, Tuple, Optional
-from urllib.parse import urljoin, urlparse, urlunparse
+from pathlib import Path
+from typing import AsyncIterator, List, Set, Dict, Tuple, Optional
+from urllib.parse import urlparse
 from urllib.robotparser import RobotFileParser
-import gzip
+import zlib
 
+import ahocorasick
 import httpx
 from lxml import etree, html
 
@@ -27,166 +33,464 @@ USER_AGENT = (
     "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 )
 
+# Connection pool sized to the number of in-flight page fetches
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+
+# Page-crawl workers (one per pooled connection) and progress log interval
+CRAWL_WORKERS = MAX_CONNECTIONS
+CRAWL_LOG_EVERY = 50
+
 # Keywords for filtering and scoring
-KEYWORDS_PRIMARY = [
+KEYWORDS_PRIMARY = (
     "shipping", "delivery", "returns", "return", "refund", "exchange", "exchanges",
     "warranty", "guarantee", "shipping-policy", "return-policy", "shipping-info"
-]
+)
 
-KEYWORDS_SECONDARY = [
+KEYWORDS_SECONDARY = (
     "policy", "policies", "help", "support", "faq", "faqs", "customer-service",
     "customer-care", "care", "assistance", "contact", "about"
-]
+)
 
-PATH_KEYWORDS = [
+PATH_KEYWORDS = (
     "return-policy", "returns-policy", "shipping-policy", "delivery-policy",
     "how-to-return", "howtoreturn", "returns-exchanges", "shipping-delivery",
     "help-center", "customer-care", "customer-service", "support-center"
-]
+)
 
 # Noise patterns to avoid
-NOISE_PATTERNS = [
+NOISE_PATTERNS = (
     "/products/", "/product/", "/collections/", "/cart", "/checkout",
     "/search", "/account", "/signin", "/login", "/signup", "/register",
     "/blogs/", "/blog/", "/news/", "/press/", "?", "#", "/archive/"
-]
+)
 
 # Non-English locales to skip
-NON_EN_LOCALES = [
+NON_EN_LOCALES = (
     "/fr/", "/es/", "/de/", "/it/", "/jp/", "/zh/", "/pt/", "/ru/",
     "/mx/", "/cl/", "/cr/", "/ar/", "/br/", "/co/", "/pe/", "/uy/",
     "/ve/", "/uk/", "/tr/", "/kz/", "/kh/", "/nl/", "/sv/", "/da/"
-]
+)
+
+# Allowed US patterns
+US_PATTERNS = (
+    "/us/", "/en-us/", "/us-en/", "/en_us/", "/us_en/"
+)
+
+# Forbidden non-US patterns
+NON_US_PATTERNS = (
+    "/en-gb/", "/en-au/", "/en-ca/", "/en-nz/", "/en-eu/",
+    "/en-it/", "/en-ch/", "/gb/", "/au/", "/ca/", "/nz/",
+    "/fr/", "/fr-", "/de/", "/es/", "/it/", "/pt/", "/ru/",
+    "/zh/", "/jp/", "/kr/", "/mx/", "/br/", "/ar/", "/in/"
+)
+
+# "Sitemap: <url>" directives in robots.txt, matched in one pass over the file
+SITEMAP_DIRECTIVE_RE = re.compile(r'^[ \t]*sitemap[ \t]*:[ \t]*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+# scheme://netloc/path prefix of an absolute URL, i.e. the URL minus query and fragment;
+# group 1 is the netloc so the same-domain check needs no second parse. ;params on the
+# last segment are stripped separately (see strip_path_params), as urlparse does.
+CLEAN_URL_RE = re.compile(r'^https?://([^/?#]+)[^?#]*', re.IGNORECASE)
+
+
+def strip_path_params(clean_url: str, path_start: int) -> str:
+    """Drop ;params from the last path segment (e.g. ;jsessionid=...), like urlunparse(..., '', ...)."""
+    path = clean_url[path_start:]
+    last_slash = path.rfind('/')
+    semicolon = path.find(';', last_slash + 1)
+    return clean_url if semicolon < 0 else clean_url[:path_start + semicolon]
+
+# Link extraction only needs anchors: skip the id table, comments and PIs
+LINK_PARSER = html.HTMLParser(collect_ids=False, remove_comments=True, remove_pis=True)
+
+# Common policy paths (bonus)
+POLICY_PATH_PATTERNS = ("/pages/", "/help/", "/support/", "/policies/")
+
+# US-specific URLs (bonus)
+US_BONUS_PATTERNS = ("/us/", "/en-us/")
+
+# Flags carried by automaton matches (OR-ed together over one scan)
+FLAG_POLICY_PATH = 1   # common policy path, +2 once
+FLAG_US_BONUS = 2      # US-specific URL, +3 once
+FLAG_NON_EN = 4
+FLAG_US = 8
+FLAG_NON_US = 16
+FLAG_NOISE = 32        # product/cart/account-style URL
+
+
+def _build_url_automaton() -> ahocorasick.Automaton:
+    """Compile every scoring/locale pattern into one Aho-Corasick automaton.
+
+    Each pattern maps to ``(pattern, score_delta, flags)``; a pattern listed in
+    several groups sums its deltas and ORs its flags, matching the old
+    per-list loops.
+    """
+    patterns: Dict[str, List[int]] = {}
+
+    def add(words, delta: int = 0, flags: int = 0):
+        for word in words:
+            entry = patterns.setdefault(word, [0, 0])
+            entry[0] += delta
+            entry[1] |= flags
+
+    add(KEYWORDS_PRIMARY, delta=5)
+    add(KEYWORDS_SECONDARY, delta=3)
+    add(PATH_KEYWORDS, delta=4)
+    add(NOISE_PATTERNS, delta=-2, flags=FLAG_NOISE)
+    add(POLICY_PATH_PATTERNS, flags=FLAG_POLICY_PATH)
+    add(US_BONUS_PATTERNS, flags=FLAG_US_BONUS)
+    add(NON_EN_LOCALES, flags=FLAG_NON_EN)
+    add(US_PATTERNS, flags=FLAG_US)
+    add(NON_US_PATTERNS, flags=FLAG_NON_US)
+
+    automaton = ahocorasick.Automaton()
+    for word, (delta, flags) in patterns.items():
+        automaton.add_word(word, (word, delta, flags))
+    automaton.make_automaton()
+    return automaton
+
+
+URL_AUTOMATON = _build_url_automaton()
+
+
+# Policy-path (+2) and US (+3) bonuses, precomputed for every combination of the two flags
+BONUS_BY_FLAGS = tuple(
+    (2 if flags & FLAG_POLICY_PATH else 0) + (3 if flags & FLAG_US_BONUS else 0)
+    for flags in range((FLAG_POLICY_PATH | FLAG_US_BONUS) + 1)
+)
+
+
+def scan_url(url_lower: str, _iter=URL_AUTOMATON.iter) -> Tuple[int, int]:
+    """Single pass over a lowercased URL: returns (keyword score delta, flags)."""
+    score = 0
+    flags = 0
+    # Each distinct pattern counts once, however often it occurs
+    for _, delta, match_flags in {value for _, value in _iter(url_lower)}:
+        score += delta
+        flags |= match_flags
+    return score, flags
+
+
+def is_allowed_locale(flags: int) -> bool:
+    """English and US (or generic) URL, given the flags from scan_url."""
+    if flags & FLAG_NON_EN:
+        return False
+    # If has US pattern, it's US; if no country indicators, assume US (generic)
+    return bool(flags & FLAG_US) or not flags & FLAG_NON_US
+
+
+# On-disk cache for robots.txt and sitemap bodies (they rarely change within a day)
+CACHE_DIR = Path(os.getenv("CRAWLER_CACHE_DIR", "~/.cache/crawler")).expanduser()
+CACHE_TTL = int(os.getenv("CRAWLER_CACHE_TTL", "86400"))  # Seconds before revalidating
+
+
+def cache_paths(url: str) -> Tuple[Path, Path]:
+    """Body and metadata (validators) paths for a cached URL."""
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return CACHE_DIR / key, CACHE_DIR / f"{key}.json"
+
+
+def read_cache_file(path: Path, chunk_size: int = 64 * 1024):
+    """Yield a cached body in chunks."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# REALISTIC headers to avoid bot detection
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+}
+
+# One pooled client shared by every crawl (connections, TLS sessions, DNS)
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    # A client is bound to the loop it was created on (e.g. repeated asyncio.run)
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=httpx.Timeout(15.0),
+            follow_redirects=True,
+            # Pool matches crawl concurrency; politeness is handled per request, not here
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+            ),
+            http2=True  # Multiplex same-origin requests over one connection
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client():
+    """Close the shared AsyncClient (call on shutdown)."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def url_key(url: str) -> int:
+    """64-bit fingerprint for URL dedup sets.
+    
+    str hashes are cached on the string object and only need to be stable
+    within one process, which is all the in-memory crawl sets require.
+    """
+    return hash(url)
+
+
+class AdaptiveLimiter:
+    """AIMD request limiter for one domain (latency-based, TCP Vegas style).
+    
+    Caps in-flight requests at ``limit`` and paces request starts at ``rate``
+    per second. A stretch of fast, successful responses grows both
+    additively; a 429, a 5xx, a network error or a latency spike well above
+    the moving baseline shrinks ``limit`` by one and halves ``rate``.
+    ``pause`` applies a hard backoff (e.g. from Retry-After) to every request.
+    """
+    
+    def __init__(self, limit: int = 4, rate: float = 2.0, max_limit: int = MAX_CONNECTIONS,
+                 min_rate: float = 0.5, max_rate: float = 50.0):
+        self.limit = limit
+        self.rate = rate
+        self.max_limit = max_limit
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None  # Moving average of good responses
+        self.good_streak = 0
+        self.backoff = 1.0  # Doubled on each 429 without Retry-After
+        self._next_start = 0.0  # Earliest monotonic time the next request may start
+        self._cond = asyncio.Condition()
+    
+    async def acquire(self):
+        """Wait for a concurrency slot, then for this request's pacing slot."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + 1.0 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+    
+    async def release(self, latency: float, status: Optional[int]):
+        """Free the slot and adapt limit/rate from the observed response."""
+        async with self._cond:
+            self.in_flight -= 1
+            
+            # Ignore jitter on very fast responses: slow means 2x baseline and over 1s
+            slow = self.baseline_latency is not None and latency > max(2 * self.baseline_latency, 1.0)
+            if status is None or status == 429 or status >= 500 or slow:
+                # Multiplicative decrease
+                self.limit = max(1, self.limit - 1)
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.good_streak = 0
+            else:
+                if self.baseline_latency is None:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency = 0.8 * self.baseline_latency + 0.2 * latency
+                self.backoff = 1.0
+                
+                # Additive increase after a full window of good responses
+                self.good_streak += 1
+                if self.good_streak >= self.limit:
+                    self.good_streak = 0
+                    self.limit = min(self.max_limit, self.limit + 1)
+                    self.rate = min(self.max_rate, self.rate + 1.0)
+            
+            self._cond.notify_all()
+    
+    def next_backoff(self) -> float:
+        """Exponential backoff delay for a 429 without Retry-After (max 30s)."""
+        self.backoff = min(self.backoff * 2, 30.0)
+        return self.backoff
+    
+    def pause(self, delay: float):
+        """Hold back every request to this domain for ``delay`` seconds."""
+        self._next_start = max(self._next_start, time.monotonic() + delay)
+
+
+class SitemapParser:
+    """Incremental parser for XML sitemaps, sitemap indexes and plain-text URL lists.
+    
+    Feed (already decompressed) bytes as they arrive. The format is sniffed from
+    the first non-whitespace byte: ``<`` means XML, anything else a text sitemap
+    with one URL per line. For XML, the root tag tells <sitemapindex> from
+    <urlset>, so every <loc> is dispatched in the same pass: to
+    ``on_sitemap_url`` inside an index, otherwise to ``on_page_url``.
+    """
+    
+    def __init__(self, on_page_url, on_sitemap_url):
+        self.on_page_url = on_page_url
+        self.on_sitemap_url = on_sitemap_url
+        self.format: Optional[str] = None  # 'xml' or 'text' once sniffed
+        self.is_index = False
+        self._head = b''
+        self._text_tail = b''
+        self._xml: Optional[etree.XMLPullParser] = None
+    
+    def feed(self, data: bytes):
+        if self.format is None:
+            self._head += data
+            start = self._head.lstrip(b' \t\r\n\xef\xbb\xbf')  # Whitespace / UTF-8 BOM
+            if not start:
+                return
+            data, self._head = self._head, b''
+            if start[:1] == b'<':
+                self.format = 'xml'
+                # Pull parser: same events as iterparse, but fed from the async body
+                self._xml = etree.XMLPullParser(events=('start', 'end'), tag=('{*}sitemapindex', '{*}loc'))
+            else:
+                self.format = 'text'
+        
+        if self.format == 'xml':
+            self._xml.feed(data)
+            self._read_xml_events()
+        else:
+            lines = (self._text_tail + data).split(b'\n')
+            self._text_tail = lines.pop()
+            self._read_text_lines(lines)
+    
+    def close(self):
+        if self.format == 'xml':
+            self._xml.close()
+            self._read_xml_events()
+        elif self.format == 'text':
+            self._read_text_lines([self._text_tail])
+            self._text_tail = b''
+    
+    def _read_xml_events(self):
+        for event, elem in self._xml.read_events():
+            if elem.tag.rpartition('}')[2] == 'sitemapindex':
+                if event == 'start':
+                    self.is_index = True
+                continue
+            if event != 'end':
+                continue
+            
+            loc = (elem.text or '').strip()
+            if loc:
+                (self.on_sitemap_url if self.is_index else self.on_page_url)(loc)
+            
+            # Drop the finished element and every entry before its own
+            elem.clear()
+            entry = elem.getparent()
+            if entry is not None:
+                while entry.getprevious() is not None:
+                    del entry.getparent()[0]
+    
+    def _read_text_lines(self, lines: List[bytes]):
+        for line in lines:
+            url = line.strip().decode('utf-8', errors='replace')
+            if url.startswith('http'):
+                self.on_page_url(url)
 
 
 class CompleteCrawler:
-    def __init__(self, domain: str, max_pages: int = 1000):
+    def __init__(self, domain: str, max_pages: int = 1000, top_k: Optional[int] = None):
         self.domain = domain
         self.max_pages = max_pages
+        self.top_k = top_k  # Keep only the best top_k policy URLs (None: all)
         self.base_url = f"https://{domain}"
-        self.found_urls: Set[str] = set()
-        self.crawled_urls: Set[str] = set()
-        self.policy_urls: List[Tuple[int, str]] = []
-        self.request_delays = {}  # Track delays per domain
-        self.last_request_time = {}  # Track last request time per domain
+        self.request_headers = {'Referer': f'https://{domain}/'}  # Per-request; the client is shared
+        self._domain_lower = domain.lower()
+        self._domain_suffix = f".{self._domain_lower}"
+        # Dedup on 64-bit fingerprints; only positive-score URLs are kept as strings
+        self.seen_hashes: Set[int] = set()
+        self.crawled_hashes: Set[int] = set()
+        self.policy_urls: List[Tuple[int, str]] = []  # (-score, url), scored on arrival
+        self.limiters: Dict[str, AdaptiveLimiter] = {}  # Rate limiter per domain
+        self.sitemap_semaphore = asyncio.Semaphore(8)  # Max simultaneous sitemap fetches
+        self.seen_sitemaps: Set[str] = set()
         
     def is_same_domain(self, url: str) -> bool:
-        """Check if URL belongs to same domain."""
-        try:
-            parsed = urlparse(url)
-            return self.domain.lower() in parsed.netloc.lower()
-        except:
+        """Check if URL belongs to same domain (or one of its subdomains)."""
+        _, sep, rest = url.partition('://')
+        if not sep:
             return False
+        netloc = rest.split('/', 1)[0].split('?', 1)[0].split('#', 1)[0]
+        host = netloc.rpartition('@')[2].partition(':')[0].lower()
+        return host == self._domain_lower or host.endswith(self._domain_suffix)
     
-    def is_english_url(self, url: str) -> bool:
-        """Check if URL is likely English (avoid non-EN locales)."""
-        url_lower = url.lower()
-        return not any(locale in url_lower for locale in NON_EN_LOCALES)
-    
-    def is_us_url(self, url: str) -> bool:
-        """Check if URL is US-specific or generic (no country code)."""
-        url_lower = url.lower()
-        
-        # Allowed US patterns
-        us_patterns = [
-            "/us/", "/en-us/", "/us-en/", "/en_us/", "/us_en/",
-        ]
-        
-        # Forbidden non-US patterns  
-        non_us_patterns = [
-            "/en-gb/", "/en-au/", "/en-ca/", "/en-nz/", "/en-eu/", 
-            "/en-it/", "/en-ch/", "/gb/", "/au/", "/ca/", "/nz/",
-            "/fr/", "/fr-", "/de/", "/es/", "/it/", "/pt/", "/ru/",
-            "/zh/", "/jp/", "/kr/", "/mx/", "/br/", "/ar/", "/in/"
-        ]
-        
-        # If has US pattern, it's US
-        if any(pattern in url_lower for pattern in us_patterns):
-            return True
-            
-        # If has non-US pattern, it's not US
-        if any(pattern in url_lower for pattern in non_us_patterns):
-            return False
-            
-        # If no country indicators, assume US (generic)
-        return True
+    def is_allowed_url(self, url: str) -> bool:
+        """English + US/generic check with a single automaton scan."""
+        _, flags = scan_url(url.lower())
+        return is_allowed_locale(flags)
     
-    def score_url(self, url: str) -> int:
-        """Score URL relevance for policy/help pages."""
-        url_lower = url.lower()
-        score = 0
-        
-        # Primary keywords (high value)
-        for kw in KEYWORDS_PRIMARY:
-            if kw in url_lower:
-                score += 5
-        
-        # Secondary keywords
-        for kw in KEYWORDS_SECONDARY:
-            if kw in url_lower:
-                score += 3
-        
-        # Path-specific keywords
-        for kw in PATH_KEYWORDS:
-            if kw in url_lower:
-                score += 4
+    def _score_and_flags(self, url: str) -> Tuple[int, int]:
+        """Policy/help relevance score (0 when not positive) and the matched flags, from one scan."""
+        score, flags = scan_url(url.lower())
         
-        # Bonus for common policy paths
-        if any(path in url_lower for path in ["/pages/", "/help/", "/support/", "/policies/"]):
-            score += 2
+        # Bonus for common policy paths and extra bonus for US-specific URLs
+        score += BONUS_BY_FLAGS[flags & (FLAG_POLICY_PATH | FLAG_US_BONUS)]
         
-        # Extra bonus for US-specific URLs
-        if "/us/" in url_lower or "/en-us/" in url_lower:
-            score += 3
-        
-        # Penalty for noise
-        for noise in NOISE_PATTERNS:
-            if noise in url_lower:
-                score -= 2
-        
-        return max(0, score)
+        return (score if score > 0 else 0), flags
+    
+    def get_limiter(self, domain: str) -> "AdaptiveLimiter":
+        """Per-domain limiter, created on first use."""
+        limiter = self.limiters.get(domain)
+        if limiter is None:
+            limiter = self.limiters[domain] = AdaptiveLimiter()
+        return limiter
+    
+    async def limited_get(self, client: httpx.AsyncClient, limiter: "AdaptiveLimiter",
+                          url: str) -> httpx.Response:
+        """GET through the limiter, reporting latency and status back to it."""
+        await limiter.acquire()
+        started = time.monotonic()
+        status = None
+        try:
+            response = await client.get(url, headers=self.request_headers, follow_redirects=True)
+            status = response.status_code
+            return response
+        finally:
+            await limiter.release(time.monotonic() - started, status)
     
     async def fetch_url(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
-        """Fetch URL content with intelligent rate limiting."""
-        import time
-        
+        """Fetch URL content with adaptive per-domain rate limiting."""
         # Get domain for rate limiting
         domain = urlparse(url).netloc
-        current_time = time.time()
-        
-        # Check if we need to wait (rate limiting)
-        if domain in self.last_request_time:
-            time_since_last = current_time - self.last_request_time[domain]
-            min_delay = self.request_delays.get(domain, 2.0)  # Default 2s delay
-            
-            if time_since_last < min_delay:
-                wait_time = min_delay - time_since_last
-                logger.debug(f"Rate limiting {domain}: waiting {wait_time:.1f}s")
-                await asyncio.sleep(wait_time)
-        
-        self.last_request_time[domain] = time.time()
+        limiter = self.get_limiter(domain)
         
         try:
-            response = await client.get(url, follow_redirects=True)
+            response = await self.limited_get(client, limiter, url)
             
-            # Handle 429 Too Many Requests
+            # Handle 429 Too Many Requests: hard backoff for the whole domain
             if response.status_code == 429:
-                retry_after = response.headers.get('Retry-After')
-                if retry_after:
-                    delay = int(retry_after)
+                retry_after = response.headers.get('Retry-After', '').strip()
+                if retry_after.isdigit():
+                    delay = float(retry_after)
                     logger.warning(f"429 rate limit for {domain}, waiting {delay}s")
-                    self.request_delays[domain] = max(delay, 5.0)  # At least 5s
-                    await asyncio.sleep(delay)
                 else:
                     # Exponential backoff
-                    delay = self.request_delays.get(domain, 2.0) * 2
-                    delay = min(delay, 30.0)  # Max 30s
+                    delay = limiter.next_backoff()
                     logger.warning(f"429 rate limit for {domain}, backoff {delay}s")
-                    self.request_delays[domain] = delay
-                    await asyncio.sleep(delay)
+                limiter.pause(delay)
                 
                 # Retry once
-                response = await client.get(url, follow_redirects=True)
+                response = await self.limited_get(client, limiter, url)
             
             if response.status_code == 200:
                 return response.text
@@ -195,20 +499,89 @@ class CompleteCrawler:
             logger.debug(f"Failed to fetch {url}: {e}")
         return None
     
+    async def iter_cached_body(self, client: httpx.AsyncClient, url: str) -> AsyncIterator[bytes]:
+        """Yield a 200 response body, through the on-disk cache.
+        
+        Entries younger than CACHE_TTL are replayed without touching the network.
+        Older ones are revalidated with If-None-Match / If-Modified-Since, and a
+        304 replays the cached body. New 200 bodies are written through to the
+        cache as they stream. Any other status yields nothing.
+        """
+        body_path, meta_path = cache_paths(url)
+        meta = None
+        try:
+            meta = json.loads(meta_path.read_text())
+            if time.time() - body_path.stat().st_mtime < CACHE_TTL:
+                for chunk in read_cache_file(body_path):
+                    yield chunk
+                return
+        except (OSError, ValueError):
+            meta = None
+        
+        headers = dict(self.request_headers)
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        
+        async with client.stream("GET", url, headers=headers, follow_redirects=True) as response:
+            if response.status_code == 304 and meta:
+                os.utime(body_path)  # Fresh for another TTL
+            elif response.status_code != 200:
+                return
+            else:
+                try:
+                    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    tmp = tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.tmp', delete=False)
+                except OSError as e:
+                    logger.debug(f"Cache disabled for {url}: {e}")
+                    tmp = None
+                
+                try:
+                    async for chunk in response.aiter_bytes():
+                        if tmp:
+                            tmp.write(chunk)
+                        yield chunk
+                    if tmp:
+                        tmp.close()
+                        os.replace(tmp.name, body_path)
+                        meta_path.write_text(json.dumps({
+                            'url': url,
+                            'etag': response.headers.get('ETag'),
+                            'last_modified': response.headers.get('Last-Modified'),
+                        }))
+                        tmp = None
+                finally:
+                    if tmp:
+                        tmp.close()
+                        os.unlink(tmp.name)
+                return
+        
+        # 304 Not Modified: replay the cached copy
+        for chunk in read_cache_file(body_path):
+            yield chunk
+    
+    async def fetch_cached_text(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """Fetch a small text resource (e.g. robots.txt) through the disk cache."""
+        try:
+            chunks = [chunk async for chunk in self.iter_cached_body(client, url)]
+        except Exception as e:
+            logger.debug(f"Failed to fetch {url}: {e}")
+            return None
+        return b''.join(chunks).decode('utf-8', errors='replace') if chunks else None
+    
     async def fetch_sitemap_urls(self, client: httpx.AsyncClient) -> Set[str]:
         """Extract URLs from sitemaps."""
         urls = set()
         
         # Try robots.txt first
         robots_url = f"{self.base_url}/robots.txt"
-        robots_content = await self.fetch_url(client, robots_url)
+        robots_content = await self.fetch_cached_text(client, robots_url)
         sitemap_urls = []
         
         if robots_content:
-            for line in robots_content.splitlines():
-                if line.lower().startswith('sitemap:'):
-                    sitemap_url = line.split(':', 1)[1].strip()
-                    sitemap_urls.append(sitemap_url)
+            sitemap_urls = SITEMAP_DIRECTIVE_RE.findall(robots_content)
         
         # Fallback sitemap locations
         if not sitemap_urls:
@@ -219,79 +592,127 @@ class CompleteCrawler:
             ]
         
         # Process each sitemap
-        for sitemap_url in sitemap_urls:
-            await self.process_sitemap(client, sitemap_url, urls)
+        await asyncio.gather(*(self.process_sitemap(client, u, urls) for u in sitemap_urls))
         
         logger.info(f"Found {len(urls)} URLs from sitemaps")
         return urls
     
     async def process_sitemap(self, client: httpx.AsyncClient, sitemap_url: str, urls: Set[str]):
-        """Process a single sitemap file."""
+        """Process a single sitemap file, parsing it incrementally as it streams in.
+        
+        Nested sitemaps are processed concurrently; sharing ``urls`` between
+        them is safe because every add happens on the single event loop thread.
+        """
+        if sitemap_url in self.seen_sitemaps:
+            return
+        self.seen_sitemaps.add(sitemap_url)
+        
+        nested_urls: List[str] = []
+        
+        def add_page_url(url: str):
+            if self.is_same_domain(url) and self.is_allowed_url(url):
+                urls.add(url)
+        
         try:
-            response = await client.get(sitemap_url, follow_redirects=True)
-            if response.status_code != 200:
-                return
-            
-            content = response.content
-            
-            # Handle gzipped content
-            if sitemap_url.endswith('.gz'):
+            # Hold the semaphore for the fetch only, never while awaiting children
+            async with self.sitemap_semaphore:
+                parser = SitemapParser(add_page_url, nested_urls.append)
+                decompressor = None
+                first_chunk = True
+                
+                body = self.iter_cached_body(client, sitemap_url)
                 try:
-                    content = gzip.decompress(content)
-                except:
-                    pass
-            
-            # Parse XML
-            root = etree.fromstring(content)
-            
-            # Extract URLs from sitemap
-            for loc in root.xpath("//*[local-name()='loc']/text()"):
-                url = loc.strip()
-                if url and self.is_same_domain(url) and self.is_english_url(url) and self.is_us_url(url):
-                    urls.add(url)
-            
-            # Check for sitemap index (nested sitemaps)
-            for sitemap_loc in root.xpath("//*[local-name()='sitemap']/*[local-name()='loc']/text()"):
-                nested_url = sitemap_loc.strip()
-                if nested_url and nested_url != sitemap_url:
-                    await self.process_sitemap(client, nested_url, urls)
+                    async for chunk in body:
+                        if first_chunk:
+                            first_chunk = False
+                            # Handle gzipped files (Content-Encoding is already decoded by httpx)
+                            if chunk[:2] == b'\x1f\x8b':
+                                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                        if decompressor:
+                            chunk = decompressor.decompress(chunk)
+                        parser.feed(chunk)
+                finally:
+                    await body.aclose()  # Release the response if parsing failed midway
+                
+                if decompressor:
+                    parser.feed(decompressor.flush())
+                parser.close()
         
         except Exception as e:
             logger.debug(f"Failed to process sitemap {sitemap_url}: {e}")
+        
+        # Check for sitemap index (nested sitemaps)
+        await asyncio.gather(*(self.process_sitemap(client, u, urls) for u in nested_urls))
     
     def extract_links_from_html(self, html_content: str, base_url: str) -> Set[str]:
         """Extract all links from HTML content."""
         links = set()
+        checked: Dict[str, Optional[str]] = {}  # href -> clean URL (None if rejected)
         try:
-            doc = html.fromstring(html_content)
+            doc = html.fromstring(html_content, parser=LINK_PARSER, base_url=base_url)
+            # Convert relative URLs to absolute in one C-level pass (honours <base href>)
+            doc.make_links_absolute(base_url, resolve_base_href=True)
+            
+            domain_lower = self._domain_lower
+            domain_suffix = self._domain_suffix
             
             # Find all links
-            for element in doc.xpath('.//a[@href]'):
-                href = element.get('href')
-                if href:
-                    # Convert relative URLs to absolute
-                    full_url = urljoin(base_url, href)
-                    # Clean fragment and query params for crawling
-                    parsed = urlparse(full_url)
-                    clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, '', '', ''))
-                    
-                    if (self.is_same_domain(clean_url) and 
-                        self.is_english_url(clean_url) and 
-                        self.is_us_url(clean_url) and
-                        clean_url not in self.crawled_urls):
-                        links.add(clean_url)
+            for element, attribute, href, _ in doc.iterlinks():
+                if attribute != 'href' or element.tag != 'a' or not href:
+                    continue
+                if href in checked:
+                    clean_url = checked[href]
+                else:
+                    # Clean fragment and query params for crawling (http/https only)
+                    match = CLEAN_URL_RE.match(href)
+                    clean_url = None
+                    if match:
+                        # Same-domain check inlined on the captured netloc
+                        host = match.group(1).rpartition('@')[2].partition(':')[0].lower()
+                        if host == domain_lower or host.endswith(domain_suffix):
+                            clean_url = match.group(0)
+                            if ';' in clean_url:
+                                clean_url = strip_path_params(clean_url, match.end(1))
+                            if not is_allowed_locale(scan_url(clean_url.lower())[1]):
+                                clean_url = None
+                    checked[href] = clean_url
+                
+                if clean_url and url_key(clean_url) not in self.crawled_hashes:
+                    links.add(clean_url)
         
         except Exception as e:
             logger.debug(f"Failed to extract links from HTML: {e}")
         
         return links
     
+    def add_found_urls(self, urls) -> List[str]:
+        """Record and score URLs not seen before; returns the new ones worth crawling."""
+        # Integer set difference instead of comparing long URL strings
+        by_hash = {url_key(url): url for url in urls}
+        new_urls = [by_hash[key] for key in by_hash.keys() - self.seen_hashes]
+        self.seen_hashes.update(by_hash)
+        
+        to_crawl = []
+        for url in new_urls:
+            score, flags = self._score_and_flags(url)
+            if score > 0:  # Only keep URLs with positive scores
+                self.policy_urls.append((-score, url))
+            elif flags & FLAG_NOISE:
+                continue  # Noise with nothing useful: seen, but never fetched
+            to_crawl.append(url)
+        
+        # Bounded memory: once candidates reach 2x top_k, keep only the best top_k
+        if self.top_k and len(self.policy_urls) >= 2 * self.top_k:
+            self.policy_urls = heapq.nsmallest(self.top_k, self.policy_urls)
+        return to_crawl
+    
     async def crawl_page(self, client: httpx.AsyncClient, url: str) -> Set[str]:
         """Crawl a single page and extract links."""
-        if url in self.crawled_urls or len(self.crawled_urls) >= self.max_pages:
+        key = url_key(url)
+        if key in self.crawled_hashes or len(self.crawled_hashes) >= self.max_pages:
             return set()
         
-        self.crawled_urls.add(url)
+        self.crawled_hashes.add(key)
         logger.debug(f"Crawling: {url}")
         
         html_content = await self.fetch_url(client, url)
@@ -303,85 +724,65 @@ class CompleteCrawler:
         
         return new_links
     
+    async def crawl_worker(self, client: httpx.AsyncClient, queue: "asyncio.Queue[str]"):
+        """Crawl queued pages until cancelled, queueing newly found links."""
+        while True:
+            url = await queue.get()
+            try:
+                # Past the page budget, just drain the queue so join() returns
+                if len(self.crawled_hashes) < self.max_pages:
+                    links = await self.crawl_page(client, url)
+                    for link in self.add_found_urls(links):
+                        queue.put_nowait(link)
+                    
+                    crawled = len(self.crawled_hashes)
+                    if crawled % CRAWL_LOG_EVERY == 0:
+                        logger.info(f"Crawled: {crawled}, Found: {len(self.seen_hashes)}, Queue: {queue.qsize()}")
+            except Exception as e:
+                logger.debug(f"Failed to crawl {url}: {e}")
+            finally:
+                queue.task_done()
+    
     async def run_complete_crawl(self) -> List[str]:
         """Run complete crawl: sitemaps + page crawling."""
-        timeout = httpx.Timeout(15.0)
-        
-        # REALISTIC headers to avoid bot detection
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Referer': f'https://{self.domain}/',
-        }
-        
-        # CONSERVATIVE connection limits to avoid overwhelming servers
-        limits = httpx.Limits(
-            max_connections=2,        # Max 2 concurrent connections
-            max_keepalive_connections=1  # Keep only 1 alive
-        )
+        client = await get_client()
+        
+        # Step 1: Get URLs from sitemaps
+        logger.info("Extracting URLs from sitemaps...")
+        sitemap_urls = await self.fetch_sitemap_urls(client)
+        self.add_found_urls(sitemap_urls)
+        
+        # Step 2: Crawl starting from homepage
+        logger.info("Starting page crawling...")
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        # The homepage is always fetched: its anchors are what reach policy pages
+        queue.put_nowait(self.base_url)
+        self.add_found_urls([self.base_url])
+        
+        # A fixed pool of workers keeps every connection busy instead of waiting
+        # on the slowest page of each batch
+        workers = [asyncio.create_task(self.crawl_worker(client, queue))
+                   for _ in range(CRAWL_WORKERS)]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
         
-        async with httpx.AsyncClient(
-            headers=headers, 
-            timeout=timeout, 
-            follow_redirects=True,
-            limits=limits
-        ) as client:
-            
-            # Step 1: Get URLs from sitemaps
-            logger.info("Extracting URLs from sitemaps...")
-            sitemap_urls = await self.fetch_sitemap_urls(client)
-            self.found_urls.update(sitemap_urls)
-            
-            # Step 2: Crawl starting from homepage
-            logger.info("Starting page crawling...")
-            to_crawl = {self.base_url}
-            self.found_urls.add(self.base_url)
-            
-            while to_crawl and len(self.crawled_urls) < self.max_pages:
-                # Take batch of URLs to crawl
-                current_batch = list(to_crawl)[:10]  # Process 10 at a time
-                to_crawl = to_crawl - set(current_batch)
-                
-                # Crawl batch concurrently
-                tasks = [self.crawl_page(client, url) for url in current_batch]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Collect new links
-                for result in results:
-                    if isinstance(result, set):
-                        new_links = result - self.found_urls
-                        self.found_urls.update(new_links)
-                        to_crawl.update(new_links)
-                
-                logger.info(f"Crawled: {len(self.crawled_urls)}, Found: {len(self.found_urls)}, Queue: {len(to_crawl)}")
-                
-                # INTELLIGENT delay based on domain behavior
-                base_delay = self.request_delays.get(self.domain, 3.0)
-                await asyncio.sleep(base_delay)  # Adaptive delay per domain
-        
-        # Step 3: Score and filter URLs
-        logger.info("Scoring and filtering URLs...")
-        for url in self.found_urls:
-            score = self.score_url(url)
-            if score > 0:  # Only keep URLs with positive scores
-                self.policy_urls.append((score, url))
+        logger.info(f"Crawled: {len(self.crawled_hashes)}, Found: {len(self.seen_hashes)}, Queue: {queue.qsize()}")
         
-        # Sort by score (highest first)
-        self.policy_urls.sort(key=lambda x: (-x[0], x[1]))
+        # Step 3: URLs were scored as they arrived; sort by score (highest first)
+        self.policy_urls.sort()
+        if self.top_k:
+            del self.policy_urls[self.top_k:]
         
-        return [url for score, url in self.policy_urls]
+        return [url for _, url in self.policy_urls]
 
 
 async def find_policy_links(domain: str, limit: int = 20, max_pages: int = 500) -> List[str]:
     """Find policy/help links for a domain."""
-    crawler = CompleteCrawler(domain, max_pages)
+    crawler = CompleteCrawler(domain, max_pages, top_k=limit)
     all_policy_links = await crawler.run_complete_crawl()
     
     logger.info(f"Found {len(all_policy_links)} policy-related URLs")
@@ -438,6 +839,8 @@ async def main():
         
     except Exception as e:
         logger.error(f"Crawling failed: {e}")
+    finally:
+        await close_client()
 
 
 if __name__ == '__main__':
@@ -9,7 +9,8 @@ from dotenv import load_dotenv
 
 from database import init_db, get_db
 from models import AnalysisResult, AnalysisJob
-from scraper import EcommerceScraper
+from scraper import EcommerceScraper, start_queue_logging
+from complete_crawler import close_client
 from analyzer import PolicyAnalyzer
 
 load_dotenv()
@@ -37,10 +38,20 @@ class AnalysisResponse(BaseModel):
     status: str
     message: str
 
+log_listener = None
+
 @app.on_event("startup")
 async def startup():
+    global log_listener
+    log_listener = start_queue_logging()
     await init_db()
 
+@app.on_event("shutdown")
+async def shutdown():
+    await close_client()
+    if log_listener is not None:
+        log_listener.stop()
+
 @app.get("/")
 async def root():
     return {"message": "E-commerce Policy Analyzer API", "version": "1.0.0"}
@@ -246,11 +257,11 @@ async def process_website(job_id: str, url: str):
         db.commit()
         
         # Initialize scraper and analyzer
-        scraper = EcommerceScraper()
         analyzer = PolicyAnalyzer()
         
         # Scrape the website
-        scraped_data = await scraper.scrape_website(url)
+        async with EcommerceScraper() as scraper:
+            scraped_data = await scraper.scrape_website(url)
         
         # Analyze with AI
         analysis = await analyzer.analyze_policies(scraped_data)
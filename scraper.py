@@ -1,16 +1,297 @@
 
 import asyncio
+import hashlib
+import json
+import logging
+import os
+import queue
 import re
+import tempfile
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
 from urllib.parse import urlparse
-from typing import Dict, Optional, List
-import requests
-from bs4 import BeautifulSoup
-from complete_crawler import find_policy_links
+from typing import AsyncIterator, Dict, Optional, List, Set, Tuple, Union
+import ahocorasick
+import httpx
+from lxml import etree, html as lxml_html
+from openai import AsyncOpenAI
+from complete_crawler import CACHE_DIR, find_policy_links
+
+logger = logging.getLogger(__name__)
+
+
+def start_queue_logging() -> QueueListener:
+    """Hand scraper log records to a background thread so the event loop never writes to stdout.
+    
+    Call once at app startup; stop the returned listener on shutdown. SCRAPER_LOG_LEVEL
+    (default INFO) sets the level; WARNING in production makes per-page logging free.
+    """
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    
+    logger.addHandler(QueueHandler(records))
+    logger.setLevel(os.getenv("SCRAPER_LOG_LEVEL", "INFO").upper())
+    logger.propagate = False  # Don't also write through the root handler
+    listener.start()
+    return listener
+
+
+# Chromium flags for headless rendering inside containers
+BROWSER_ARGS = (
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-blink-features=AutomationControlled",
+)
+
+# Browser contexts kept open for rendering (pages rendered in parallel);
+# each is replaced after CONTEXT_MAX_USES pages so leaks don't accumulate
+CONTEXT_POOL_SIZE = 4
+CONTEXT_MAX_USES = 50
+
+# Text extraction only needs HTML + JS; never download these
+BLOCKED_RESOURCE_TYPES = frozenset(("image", "media", "font", "stylesheet"))
+
+
+async def _block_heavy_resources(route):
+    """Playwright route handler: abort images/media/fonts/CSS, let the rest through"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# Client-rendered shells: an empty mount point and no server-rendered <main>
+SPA_ROOT_RE = re.compile(r'<div[^>]*\sid=(["\']?)(?:root|app|__next)\1(?=[\s/>])[^>]*>\s*</div>', re.IGNORECASE)
+MAIN_TAG_RE = re.compile(r'<main[\s>]', re.IGNORECASE)
+
+
+def _looks_like_spa(html: str) -> bool:
+    """True when the HTML needs a browser to render its content"""
+    return bool(SPA_ROOT_RE.search(html)) and not MAIN_TAG_RE.search(html)
+
+
+# Page type from URL keywords, checked in this order (one compiled search each)
+URL_PAGE_TYPES = (
+    ('shipping', re.compile('shipping|delivery|fulfillment', re.IGNORECASE)),
+    ('returns', re.compile('return|refund|exchange', re.IGNORECASE)),
+    ('help', re.compile('faq|help|support', re.IGNORECASE)),
+    ('contact', re.compile('contact|about', re.IGNORECASE)),
+)
+
+# Content scores count distinct keywords present, found in one automaton pass
+SHIPPING_CONTENT_KEYWORDS = frozenset(('shipping', 'delivery', 'fulfillment', 'ship'))
+RETURNS_CONTENT_KEYWORDS = frozenset(('return', 'refund', 'exchange'))
+
+
+def _build_content_automaton() -> ahocorasick.Automaton:
+    """Aho-Corasick automaton over every content-scoring keyword"""
+    automaton = ahocorasick.Automaton()
+    for word in SHIPPING_CONTENT_KEYWORDS | RETURNS_CONTENT_KEYWORDS:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+CONTENT_AUTOMATON = _build_content_automaton()
+
+# Policy-related text inside embedded JSON
+POLICY_TEXT_RE = re.compile('shipping|return|policy|delivery|refund|exchange|final sale|free shipping', re.IGNORECASE)
+_NO_KEY = object()  # List items carry no key in _extract_text_from_json
+
+
+# In-page text extraction in one evaluate round trip: strip boilerplate, then take the
+# first priority selector whose innerText (what the user sees) is substantial; the
+# winning text is read once and returned as is
+EXTRACT_TEXT_JS = '''() => {
+    document.querySelectorAll('script, style, nav, header, footer, aside, noscript').forEach(el => el.remove());
+    
+    const selectors = [
+        'main', '[role="main"]', '.main-content', '.content',
+        '.policy-content', '.page-content', '.rte', '.shopify-policy__container',
+        'article', '.article', '[class*="policy"]', '[class*="shipping"]', '[class*="return"]'
+    ];
+    for (const selector of selectors) {
+        const element = document.querySelector(selector);
+        if (element) {
+            const text = element.innerText;
+            if (text.length > 200) {
+                return text;
+            }
+        }
+    }
+    
+    const body = document.body;
+    return body ? (body.innerText || body.textContent || '') : '';
+}'''
+
+# Read at most this much of a page body for the plain-HTTP path
+MAX_PAGE_BYTES = 200_000
+
+# Main-content candidates in priority order, as (test, value) forms of the CSS selectors
+# main, [role=main], .main-content, .content, .policy-content, .page-content, .rte,
+# .shopify-policy__container, article, .article, [class*=policy|shipping|return]
+CONTENT_SELECTORS = (
+    ('tag', 'main'),
+    ('role', 'main'),
+    ('class', 'main-content'),
+    ('class', 'content'),
+    ('class', 'policy-content'),
+    ('class', 'page-content'),
+    ('class', 'rte'),
+    ('class', 'shopify-policy__container'),
+    ('tag', 'article'),
+    ('class', 'article'),
+    ('class*', 'policy'),
+    ('class*', 'shipping'),
+    ('class*', 'return'),
+)
+
+
+def _selector_xpath(test: str, value: str) -> str:
+    """XPath for one CONTENT_SELECTORS entry"""
+    if test == 'tag':
+        return f'//{value}'
+    if test == 'class':
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]"
+    if test == 'class*':
+        return f"//*[contains(@class, '{value}')]"
+    return f"//*[@{test}='{value}']"
+
+
+def _selector_rank(element) -> int:
+    """Index of the first CONTENT_SELECTORS entry the element matches"""
+    classes = element.get('class') or ''
+    tokens = classes.split()
+    for rank, (test, value) in enumerate(CONTENT_SELECTORS):
+        if test == 'tag':
+            hit = element.tag == value
+        elif test == 'class':
+            hit = value in tokens
+        elif test == 'class*':
+            hit = value in classes
+        else:
+            hit = element.get(test) == value
+        if hit:
+            return rank
+    return len(CONTENT_SELECTORS)
+
+
+# All candidates in a single pass (document order); the winner is picked by selector rank
+CONTENT_XPATH = etree.XPath(' | '.join(_selector_xpath(test, value) for test, value in CONTENT_SELECTORS))
+
+# Boilerplate removed before extracting text
+STRIP_XPATH = etree.XPath("//script | //style | //nav | //header | //footer | //aside | //noscript")
+
+# Comments and PIs never carry page text
+CONTENT_PARSER = lxml_html.HTMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+# Policy URLs handed to the page scraper per site
+MAX_POLICY_URLS = 10
+
+# Cart/account/catalogue/blog URLs never hold policies; dropped before AI prioritization
+NON_POLICY_URL_RE = re.compile(
+    r'/(?:cart|checkout|login|account|products?|collections?|blogs?)(?:[/?#.]|$)', re.IGNORECASE
+)
+
+# Help/support subdomains probed before crawling the main site, in priority order
+HELP_SUBDOMAINS = ("help", "support", "faq", "care")
+
+# Common policy paths tried when crawling fails
+FALLBACK_POLICY_PATHS = (
+    '/pages/shipping-policy', '/pages/shipping-information', '/pages/shipping',
+    '/pages/return-policy', '/pages/returns-exchanges', '/pages/returns',
+    '/pages/faq', '/pages/help', '/pages/support', '/pages/customer-service',
+    '/help', '/support', '/faq', '/shipping', '/returns', '/policies',
+    '/customer-service', '/customer-care', '/contact-us', '/about-us',
+)
+
+# Shopify canonical URLs (highest priority first)
+SHOPIFY_POLICY_PATHS = (
+    '/policies/shipping-policy', '/policies/refund-policy', '/policies/return-policy',
+    '/policies/terms-of-service', '/policies/privacy-policy',
+    '/pages/shipping-policy', '/pages/shipping-information', '/pages/shipping',
+    '/pages/return-policy', '/pages/returns-exchanges', '/pages/returns',
+    '/pages/refund-policy', '/pages/exchange-policy',
+    '/pages/faq', '/pages/help', '/pages/customer-service',
+)
+
+# Shopify detection signals
+SHOPIFY_ENDPOINTS = ("/cart.js", "/products.json")
+SHOPIFY_COOKIE_SIGNALS = ("_shopify_", "cart_sig")
+SHOPIFY_HTML_SIGNALS = ("window.Shopify", "ShopifyAnalytics", "cdn.shopify.com", "/s/files/1/")
+
+
+# Subdomain probes are reused for an hour; discovered policy URLs persist on disk
+DOMAIN_EXISTS_TTL = 3600
+POLICY_URLS_CACHE_DIR = CACHE_DIR / "policy_urls"
+POLICY_URLS_TTL = int(os.getenv("POLICY_URLS_CACHE_TTL", "86400"))
+
+
+def _policy_urls_path(domain: str) -> Path:
+    """Disk location of the memoised policy URLs for a domain"""
+    return POLICY_URLS_CACHE_DIR / f"{hashlib.sha1(domain.lower().encode()).hexdigest()}.json"
+
+
+def load_cached_policy_urls(domain: str) -> Optional[List[str]]:
+    """Policy URLs saved for this domain within POLICY_URLS_TTL, else None"""
+    path = _policy_urls_path(domain)
+    try:
+        if time.time() - path.stat().st_mtime >= POLICY_URLS_TTL:
+            return None
+        return json.loads(path.read_text())["urls"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# AI URL prioritization: one shared async client, results reused per URL set
+AI_PRIORITY_CACHE_SIZE = 1024
+_ai_client: Optional[AsyncOpenAI] = None
+_ai_priority_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+DIGITS_RE = re.compile(r'\d+')  # Priority numbers in the model's reply
+
+
+def get_ai_client() -> AsyncOpenAI:
+    """Shared AsyncOpenAI client, created on first use (after .env is loaded)"""
+    global _ai_client
+    if _ai_client is None:
+        _ai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _ai_client
+
+
+def _url_set_key(urls: List[str]) -> str:
+    """Order-independent cache key for a list of URLs"""
+    return hashlib.sha1("\n".join(sorted(set(urls))).encode()).hexdigest()
+
+
+def store_policy_urls(domain: str, urls: List[str]):
+    """Persist discovered policy URLs (atomic replace, failures ignored)"""
+    try:
+        POLICY_URLS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=POLICY_URLS_CACHE_DIR, suffix='.tmp', delete=False) as tmp:
+            json.dump({"domain": domain, "urls": urls}, tmp)
+        os.replace(tmp.name, _policy_urls_path(domain))
+    except OSError as e:
+        logger.warning(f"  ⚠️ Could not cache policy URLs for {domain}: {e}")
+
 
 class EcommerceScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self._client: Optional[httpx.AsyncClient] = None
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._context_pool: Optional[asyncio.Queue] = None  # (context, uses) pairs; None context = open on borrow
+        self._shopify_cache: Dict[str, bool] = {}  # Detection runs once per domain
+        self._domain_exists_cache: Dict[str, Tuple[float, bool]] = {}  # url -> (checked_at, exists)
+        self._headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -23,13 +304,88 @@ class EcommerceScraper:
             'Sec-Ch-Ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
             'Sec-Ch-Ua-Mobile': '?0',
             'Sec-Ch-Ua-Platform': '"Windows"'
-        })
+        }
         
     async def __aenter__(self):
+        # One long-lived async client: pooled keep-alive connections, no blocking calls.
+        # HTTP/2 multiplexes the concurrent per-host probes over one TLS connection.
+        self._client = httpx.AsyncClient(
+            headers=self._headers,
+            timeout=httpx.Timeout(15.0),
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(max_connections=128, max_keepalive_connections=32),
+        )
+        self._browser_lock = asyncio.Lock()
+        self._context_pool = asyncio.Queue()
+        for _ in range(CONTEXT_POOL_SIZE):
+            self._context_pool.put_nowait((None, 0))  # Contexts are opened on first borrow
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        pass
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._browser is not None:
+            await self._browser.close()  # Also closes every pooled context
+            self._browser = None
+            self._context_pool = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def _get_browser(self):
+        """Launch the shared Chromium instance on first use"""
+        async with self._browser_lock:
+            if self._browser is None:
+                from playwright.async_api import async_playwright
+                
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True, args=list(BROWSER_ARGS))
+        return self._browser
+    
+    async def _new_context(self):
+        """Open a browser context with the scraper's User-Agent and resource blocking"""
+        context = await self._browser.new_context(user_agent=self._headers['User-Agent'])
+        await context.route("**/*", _block_heavy_resources)
+        return context
+    
+    async def _acquire_context(self):
+        """Borrow a (context, uses) pair from the pool, opening the context if its slot is empty"""
+        context, uses = await self._context_pool.get()
+        if context is None:
+            try:
+                context = await self._new_context()
+            except BaseException:
+                self._context_pool.put_nowait((None, 0))  # Keep the slot so get() never waits forever
+                raise
+        return context, uses
+    
+    async def _release_context(self, context, uses: int):
+        """Return a context to the pool; a worn-out one frees its slot for a fresh context"""
+        if uses < CONTEXT_MAX_USES:
+            self._context_pool.put_nowait((context, uses))
+            return
+        
+        # The slot goes back before any await, so a failed or cancelled close can't drain the pool
+        self._context_pool.put_nowait((None, 0))
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"    ⚠️ Could not close worn-out browser context: {e}")
+
+    async def scrape_many(self, urls: List[str], max_concurrent: int = 10) -> List[Union[Dict, BaseException]]:
+        """Scrape several sites concurrently, sharing this scraper's client and browser.
+        
+        Results come back in input order; a site that raised yields its exception.
+        """
+        sem = asyncio.Semaphore(max_concurrent)
+        
+        async def scrape_bounded(url: str) -> Dict:
+            async with sem:
+                return await self.scrape_website(url)
+        
+        return await asyncio.gather(*[scrape_bounded(url) for url in urls], return_exceptions=True)
 
     async def scrape_website(self, url: str) -> Dict:
         """NEW OPTIMIZED scraper - uses complete_crawler to find ALL links first"""
@@ -42,89 +398,107 @@ class EcommerceScraper:
         }
         
         try:
-            print(f"🔍 Scraping {url}...")
+            logger.info(f"🔍 Scraping {url}...")
+            
+            # STEP 1: Get main page over HTTP (fast), overlapping URL discovery
+            main_task = asyncio.create_task(self._get_page_content_requests(url))
+            
+            # STEP 2: Smart URL discovery with help domain check + AI prioritization.
+            # Each URL starts scraping as soon as it is discovered.
+            logger.info(f"  🔄 Finding policy URLs for domain: {domain}")
+            logger.info(f"  📚 Scraping ALL policy pages for comprehensive AI analysis...")
+            max_pages = 10  # Scrape more pages for better AI analysis
+            
+            # Render pages concurrently; at most 4 in flight per site to stay polite
+            sem = asyncio.Semaphore(4)
+            tasks = []
+            try:
+                stream = self._stream_policy_urls(domain)
+                try:
+                    async for page_url in stream:
+                        # Shopify /pages and /policies are fully server-rendered on the store's own host
+                        fast_only = urlparse(page_url).netloc == domain and await self._is_shopify_site(domain)
+                        tasks.append(asyncio.create_task(
+                            self._scrape_one(len(tasks) + 1, page_url, sem, fast_only=fast_only)
+                        ))
+                        if len(tasks) >= max_pages:
+                            break
+                finally:
+                    await stream.aclose()
+                logger.info(f"🔗 Found {len(tasks)} prioritized policy URLs")
+            except Exception as e:
+                # Keep the main page and whatever was discovered before the failure
+                logger.warning(f"  ⚠️ Policy URL discovery failed after {len(tasks)} URLs: {e}")
+            finally:
+                # STEP 3: SCRAPE ALL PAGES - let AI decide what's useful
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                main_content = await main_task
             
-            # STEP 1: Get main page with requests (fast)
-            main_content = self._get_page_content_requests(url)
             if main_content:
                 scraped_content['policy_pages']['main'] = {
                     'url': url,
                     'content': main_content
                 }
-                print(f"✅ Main page scraped: {len(main_content)} chars")
+                logger.info(f"✅ Main page scraped: {len(main_content)} chars")
             
-            # STEP 2: Smart URL discovery with help domain check + AI prioritization
-            print(f"  🔄 Finding policy URLs for domain: {domain}")
-            policy_urls = await self._get_prioritized_policy_urls(domain)
-            print(f"🔗 Found {len(policy_urls)} prioritized policy URLs")
-            
-            # STEP 3: SCRAPE ALL PAGES - let AI decide what's useful
-            scraped_count = 0
-            max_pages = 10  # Scrape more pages for better AI analysis
-            
-            print(f"  📚 Scraping ALL policy pages for comprehensive AI analysis...")
-            
-            for i, page_url in enumerate(policy_urls, 1):
-                # ONLY stop if we hit the limit
-                if scraped_count >= max_pages:
-                    print(f"  ⏹️ Reached limit of {max_pages} pages")
-                    break
+            # Classify and store in URL order, as the sequential loop did
+            for result in results:
+                if isinstance(result, Exception):
+                    continue
+                i, page_url, content = result
+                if content and len(content) > 200:  # Minimum content threshold
+                    page_type = self._classify_page_type(page_url, content)
                     
-                try:
-                    print(f"  📄 [{i}/{len(policy_urls)}] Scraping: {page_url}")
+                    # STORE ALL PAGES - no skipping duplicates, let AI choose
+                    page_key = f"{page_type}_{i}" if page_type in scraped_content['policy_pages'] else page_type
                     
-                    # USE PLAYWRIGHT FOR ALL SITES - no more BeautifulSoup corruption
-                    print(f"    🎭 Using Playwright for clean content extraction...")
-                    content = await self._get_clean_content_playwright(page_url)
+                    scraped_content['policy_pages'][page_key] = {
+                        'url': page_url,
+                        'content': content
+                    }
                     
-                    if content and len(content) > 200:  # Minimum content threshold
-                        page_type = self._classify_page_type(page_url, content)
-                        
-                        # STORE ALL PAGES - no skipping duplicates, let AI choose
-                        page_key = f"{page_type}_{i}" if page_type in scraped_content['policy_pages'] else page_type
-                        
-                        scraped_content['policy_pages'][page_key] = {
-                            'url': page_url,
-                            'content': content
-                        }
-                        scraped_count += 1
-                        
-                        print(f"    📝 Stored as: {page_key} ({len(content)} chars)")
-                        
-                        # Add human-like delay between requests
-                        import time
-                        time.sleep(1.5)  # 1.5 second delay to avoid being flagged as bot
-                        
-                except Exception as e:
-                    print(f"  ❌ Error scraping {page_url}: {e}")
-                    continue
+                    logger.debug(f"    📝 Stored as: {page_key} ({len(content)} chars)")
             
-            print(f"📄 Total pages scraped: {len(scraped_content['policy_pages'])}")
-            print(f"📚 ALL pages will be sent to AI for comprehensive analysis")
+            logger.info(f"📄 Total pages scraped: {len(scraped_content['policy_pages'])}")
+            logger.info(f"📚 ALL pages will be sent to AI for comprehensive analysis")
             
         except Exception as e:
-            print(f"❌ Error scraping {url}: {e}")
+            logger.warning(f"❌ Error scraping {url}: {e}")
         
         return scraped_content
 
+    async def _scrape_one(self, i: int, page_url: str, sem: asyncio.Semaphore, fast_only: bool = False):
+        """Scrape one policy page under the shared semaphore; returns (i, url, content)"""
+        async with sem:
+            content = None
+            try:
+                logger.debug(f"  📄 [{i}] Scraping: {page_url}")
+                
+                # Fast path: server-rendered pages need no browser
+                content = await self._get_page_content_requests(page_url, reject_spa=not fast_only)
+                
+                # Thin or client-rendered pages fall back to Playwright (never for Shopify)
+                if not fast_only and (not content or len(content) < 300):
+                    logger.debug(f"    🎭 Using Playwright for clean content extraction...")
+                    content = await self._get_clean_content_playwright(page_url)
+            except Exception as e:
+                logger.warning(f"  ❌ Error scraping {page_url}: {e}")
+            
+            # Human-like delay before this slot is reused (non-blocking)
+            await asyncio.sleep(1.5)
+            return i, page_url, content
+
     def _classify_page_type(self, url: str, content: str) -> str:
         """Classify page type based on URL and content"""
-        url_lower = url.lower()
-        content_lower = content.lower()
-        
         # Check URL patterns first
-        if any(kw in url_lower for kw in ['shipping', 'delivery', 'fulfillment']):
-            return 'shipping'
-        elif any(kw in url_lower for kw in ['return', 'refund', 'exchange']):
-            return 'returns'
-        elif any(kw in url_lower for kw in ['faq', 'help', 'support']):
-            return 'help'
-        elif any(kw in url_lower for kw in ['contact', 'about']):
-            return 'contact'
+        for page_type, pattern in URL_PAGE_TYPES:
+            if pattern.search(url):
+                return page_type
         
-        # Check content patterns
-        shipping_score = sum(1 for kw in ['shipping', 'delivery', 'fulfillment', 'ship'] if kw in content_lower)
-        returns_score = sum(1 for kw in ['return', 'refund', 'exchange'] if kw in content_lower)
+        # Check content patterns (single pass over the page text)
+        found = {word for _, word in CONTENT_AUTOMATON.iter(content.lower())}
+        shipping_score = len(found & SHIPPING_CONTENT_KEYWORDS)
+        returns_score = len(found & RETURNS_CONTENT_KEYWORDS)
         
         if shipping_score > returns_score and shipping_score > 2:
             return 'shipping'
@@ -135,87 +509,125 @@ class EcommerceScraper:
     
     def _extract_text_from_json(self, data) -> str:
         """Extract all text content from JSON data (general approach)"""
-        text_content = ""
-        
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, str) and len(value) > 10:
-                    # Check if this text contains policy-related content
-                    if any(keyword in value.lower() for keyword in ['shipping', 'return', 'policy', 'delivery', 'refund', 'exchange', 'final sale', 'free shipping']):
-                        text_content += f"{key}: {value}\n"
-                elif isinstance(value, (dict, list)):
-                    text_content += self._extract_text_from_json(value)
-        elif isinstance(data, list):
-            for item in data:
-                text_content += self._extract_text_from_json(item)
+        # Depth-first walk with an explicit stack of iterators: same order as the
+        # recursive version, no recursion limit, output joined once at the end
+        chunks = []
+        stack = [iter(((_NO_KEY, data),))]
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                continue
+            
+            key, value = entry
+            if isinstance(value, str):
+                # Check if this text contains policy-related content (dict values only)
+                if key is not _NO_KEY and len(value) > 10 and POLICY_TEXT_RE.search(value):
+                    chunks.append(f"{key}: {value}\n")
+            elif isinstance(value, dict):
+                stack.append(iter(value.items()))
+            elif isinstance(value, list):
+                stack.append((_NO_KEY, item) for item in value)
         
-        return text_content
+        return "".join(chunks)
     
-    async def _get_prioritized_policy_urls(self, domain: str) -> List[str]:
-        """Get policy URLs prioritized by AI and help domain checks"""
-        import openai
-        import os
-        
-        all_urls = []
+    async def _stream_policy_urls(self, domain: str) -> AsyncIterator[str]:
+        """Yield up to MAX_POLICY_URLS policy URLs as soon as each source settles.
         
-        # STEP 1: Check help/support subdomains first (most likely to have policies)
-        help_domains = [
-            f"https://help.{domain}",
-            f"https://support.{domain}",
-            f"https://faq.{domain}",
-            f"https://care.{domain}"
-        ]
+        Validated Shopify pages are yielded before any AI call; crawled or fallback
+        URLs go through AI prioritization first. Complete runs are memoised on disk.
+        """
+        cached = load_cached_policy_urls(domain)
+        if cached:
+            logger.info(f"  💾 Using cached policy URLs for {domain}")
+            for url in cached[:MAX_POLICY_URLS]:
+                yield url
+            return
         
-        print("  🔍 Checking help/support domains...")
-        for help_url in help_domains:
-            if await self._domain_exists(help_url):
-                print(f"    ✅ Found active help domain: {help_url}")
-                # Get URLs from this help domain
-                help_urls = await find_policy_links(help_url.replace('https://', ''), limit=10, max_pages=50)
-                all_urls.extend(help_urls[:10])  # Take top 10 from help domain
-                break  # Stop at first working help domain
-        
-        # STEP 2: If no help domain, crawl main domain with fallback
-        if not all_urls:
-            print("  🔄 No help domain found, crawling main domain...")
-            try:
-                # Check if it's a Shopify site (common rate limiting)
-                if await self._is_shopify_site(domain):
-                    print("  🛍️ Shopify site detected, using smart approach...")
-                    main_urls = await self._get_shopify_policy_urls(domain)
-                else:
-                    main_urls = await find_policy_links(domain, limit=20, max_pages=100)
-                all_urls.extend(main_urls)
-            except Exception as e:
-                print(f"  ⚠️ Crawling failed ({e}), using fallback URLs...")
-                # FALLBACK: Common policy URLs if crawling fails
-                fallback_urls = self._get_fallback_policy_urls(domain)
-                all_urls.extend(fallback_urls)
-        
-        # STEP 3: Use OpenAI to prioritize URLs by relevance
-        if len(all_urls) > 5 and os.getenv("OPENAI_API_KEY"):
-            print("  🤖 Using AI to prioritize URLs...")
-            prioritized_urls = await self._ai_prioritize_urls(all_urls)
-            return prioritized_urls[:10]  # Top 10 most relevant
-        
-        return all_urls[:10]  # Fallback: take first 10
+        yielded: List[str] = []
+        guessed: Set[str] = set()  # Fallback paths: never found on the site, so never cached
+        finished = False
+        try:
+            all_urls = []
+            
+            # STEP 1: Check help/support subdomains first (most likely to have policies)
+            help_domains = [f"https://{sub}.{domain}" for sub in HELP_SUBDOMAINS]
+            
+            logger.info("  🔍 Checking help/support domains...")
+            # Probe all subdomains at once, then take the first live one in priority order
+            exists = await asyncio.gather(*[self._domain_exists(u) for u in help_domains])
+            for help_url, found in zip(help_domains, exists):
+                if found:
+                    logger.info(f"    ✅ Found active help domain: {help_url}")
+                    # Get URLs from this help domain
+                    help_urls = await find_policy_links(help_url.replace('https://', ''), limit=10, max_pages=50)
+                    all_urls.extend(help_urls[:10])  # Take top 10 from help domain
+                    break  # Stop at first working help domain
+            
+            # STEP 2: If no help domain, crawl main domain with fallback
+            if not all_urls:
+                logger.info("  🔄 No help domain found, crawling main domain...")
+                try:
+                    # Check if it's a Shopify site (common rate limiting)
+                    if await self._is_shopify_site(domain):
+                        logger.info("  🛍️ Shopify site detected, using smart approach...")
+                        # Canonical pages were validated by HEAD: start scraping them right away
+                        for url in (await self._get_shopify_policy_urls(domain))[:MAX_POLICY_URLS]:
+                            yielded.append(url)
+                            yield url
+                    else:
+                        all_urls.extend(await find_policy_links(domain, limit=20, max_pages=100))
+                except Exception as e:
+                    logger.warning(f"  ⚠️ Crawling failed ({e}), using fallback URLs...")
+                    # FALLBACK: Common policy URLs if crawling fails
+                    fallback_urls = self._get_fallback_policy_urls(domain)
+                    guessed.update(fallback_urls)
+                    all_urls.extend(fallback_urls)
+            
+            # Dedupe (order kept, already-yielded excluded) and drop obvious non-policy pages
+            seen = set(yielded)
+            all_urls = [u for u in all_urls if not (u in seen or seen.add(u))]
+            all_urls = [u for u in all_urls if not NON_POLICY_URL_RE.search(u)] or all_urls
+            
+            # STEP 3: Use OpenAI to prioritize URLs by relevance (only when there is a choice to make)
+            if len(all_urls) > MAX_POLICY_URLS - len(yielded) and os.getenv("OPENAI_API_KEY"):
+                logger.info("  🤖 Using AI to prioritize URLs...")
+                all_urls = await self._ai_prioritize_urls(all_urls)
+            
+            for url in all_urls[:MAX_POLICY_URLS - len(yielded)]:  # Top 10 most relevant
+                yielded.append(url)
+                yield url
+            finished = True
+        finally:
+            # A consumer that stopped at the cap still saw the complete list
+            discovered = [url for url in yielded if url not in guessed]
+            if discovered and (finished or len(yielded) >= MAX_POLICY_URLS):
+                store_policy_urls(domain, discovered)
     
     async def _domain_exists(self, url: str) -> bool:
         """Check if domain/subdomain exists and responds"""
+        cached = self._domain_exists_cache.get(url)
+        if cached and time.time() - cached[0] < DOMAIN_EXISTS_TTL:
+            return cached[1]
+        
         try:
-            response = self.session.head(url, timeout=5)
-            return response.status_code < 400
-        except:
-            return False
+            response = await self._client.head(url, timeout=5, follow_redirects=False)
+            exists = response.status_code < 400
+        except Exception:
+            exists = False
+        self._domain_exists_cache[url] = (time.time(), exists)
+        return exists
     
     async def _ai_prioritize_urls(self, urls: List[str]) -> List[str]:
         """Use OpenAI to prioritize URLs by relevance for shipping/returns policies"""
-        import openai
-        import os
+        # Identical URL sets (e.g. canonical Shopify /policies/*) reuse the earlier answer
+        key = _url_set_key(urls)
+        if key in _ai_priority_cache:
+            _ai_priority_cache.move_to_end(key)
+            logger.debug(f"    🎯 AI priority reused for {len(urls)} URLs")
+            return list(_ai_priority_cache[key])
         
         try:
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
             urls_text = "\n".join([f"{i+1}. {url}" for i, url in enumerate(urls)])
             
             prompt = f"""Prioritize these URLs by relevance for finding shipping and return policies. 
@@ -227,7 +639,7 @@ URLs:
 
 Priority order (numbers only):"""
 
-            response = client.chat.completions.create(
+            response = await get_ai_client().chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=100,
@@ -235,230 +647,200 @@ Priority order (numbers only):"""
             )
             
             # Parse AI response
-            priority_nums = response.choices[0].message.content.strip()
-            priority_indices = [int(x.strip()) - 1 for x in priority_nums.split(',') if x.strip().isdigit()]
+            priority_nums = response.choices[0].message.content
+            priority_indices = [int(x) - 1 for x in DIGITS_RE.findall(priority_nums)]
             
-            # Reorder URLs based on AI priority
+            # Reorder URLs based on AI priority (each URL once; set lookups keep this O(N))
             prioritized = []
+            picked = set()
             for idx in priority_indices:
-                if 0 <= idx < len(urls):
+                if 0 <= idx < len(urls) and urls[idx] not in picked:
+                    picked.add(urls[idx])
                     prioritized.append(urls[idx])
             
             # Add any missed URLs
-            for url in urls:
-                if url not in prioritized:
-                    prioritized.append(url)
+            prioritized.extend(url for url in urls if url not in picked)
+            
+            logger.debug(f"    🎯 AI prioritized {len(prioritized)} URLs")
             
-            print(f"    🎯 AI prioritized {len(prioritized)} URLs")
-            return prioritized
+            _ai_priority_cache[key] = prioritized
+            if len(_ai_priority_cache) > AI_PRIORITY_CACHE_SIZE:
+                _ai_priority_cache.popitem(last=False)
+            return list(prioritized)
             
         except Exception as e:
-            print(f"    ⚠️ AI prioritization failed: {e}")
+            logger.warning(f"    ⚠️ AI prioritization failed: {e}")
             return urls
     
     def _get_fallback_policy_urls(self, domain: str) -> List[str]:
         """Get common policy URLs as fallback when crawling fails"""
         base_url = f"https://{domain}"
-        
-        fallback_paths = [
-            '/pages/shipping-policy', '/pages/shipping-information', '/pages/shipping',
-            '/pages/return-policy', '/pages/returns-exchanges', '/pages/returns',
-            '/pages/faq', '/pages/help', '/pages/support', '/pages/customer-service',
-            '/help', '/support', '/faq', '/shipping', '/returns', '/policies',
-            '/customer-service', '/customer-care', '/contact-us', '/about-us'
-        ]
-        
-        return [f"{base_url}{path}" for path in fallback_paths]
+        return [f"{base_url}{path}" for path in FALLBACK_POLICY_PATHS]
     
     async def _is_shopify_site(self, domain: str) -> bool:
         """Detect if site is Shopify using multiple reliable signals"""
+        if domain not in self._shopify_cache:
+            self._shopify_cache[domain] = await self._detect_shopify(domain)
+        return self._shopify_cache[domain]
+    
+    async def _detect_shopify(self, domain: str) -> bool:
+        """Run the Shopify signal checks against the live site"""
         base_url = f"https://{domain}"
         
-        try:
+        # Headers HEAD and both endpoint probes in flight together
+        head, *endpoint_hits = await asyncio.gather(
+            self._client.head(base_url, timeout=12, follow_redirects=False),
+            *[self._is_json_endpoint(base_url + path) for path in SHOPIFY_ENDPOINTS],
+            return_exceptions=True
+        )
+        
+        if not isinstance(head, Exception):
             # 1) Headers check - most reliable
-            response = self.session.head(base_url, timeout=12)
-            headers = {k.lower(): v for k, v in response.headers.items()}
-            
+            headers = {k.lower(): v for k, v in head.headers.items()}
             if any(k.startswith("x-shopify") or k.startswith("x-sorting-hat") for k in headers):
-                print(f"    🛍️ Shopify detected via headers")
+                logger.info(f"    🛍️ Shopify detected via headers")
                 return True
             
             # 2) Cookies check
-            set_cookie = response.headers.get("set-cookie", "").lower()
-            if any(k in set_cookie for k in ["_shopify_", "cart_sig"]):
-                print(f"    🛍️ Shopify detected via cookies")
+            set_cookie = head.headers.get("set-cookie", "").lower()
+            if any(k in set_cookie for k in SHOPIFY_COOKIE_SIGNALS):
+                logger.info(f"    🛍️ Shopify detected via cookies")
                 return True
-            
-        except Exception:
-            pass
-
+        
         # 3) Shopify endpoints check
-        for path in ["/cart.js", "/products.json"]:
-            try:
-                response = self.session.get(base_url + path, timeout=12, headers={"Accept": "application/json"})
-                if response.status_code == 200 and "application/json" in response.headers.get("content-type", ""):
-                    print(f"    🛍️ Shopify detected via endpoint {path}")
-                    return True
-                time.sleep(1)  # Delay between endpoint checks
-            except Exception:
-                pass
-
+        for path, hit in zip(SHOPIFY_ENDPOINTS, endpoint_hits):
+            if hit is True:
+                logger.info(f"    🛍️ Shopify detected via endpoint {path}")
+                return True
+        
         # 4) HTML content check (last resort)
         try:
-            response = self.session.get(base_url, timeout=12)
+            response = await self._client.get(base_url, timeout=12)
             text = response.text
-            if any(signal in text for signal in ["window.Shopify", "ShopifyAnalytics", "cdn.shopify.com", "/s/files/1/"]):
-                print(f"    🛍️ Shopify detected via HTML content")
+            if any(signal in text for signal in SHOPIFY_HTML_SIGNALS):
+                logger.info(f"    🛍️ Shopify detected via HTML content")
                 return True
         except Exception:
             pass
 
         return False
     
+    async def _is_json_endpoint(self, url: str) -> bool:
+        """True if url answers 200 with a JSON content type (body is never read)"""
+        async with self._client.stream('GET', url, timeout=12, headers={"Accept": "application/json"}) as response:
+            return response.status_code == 200 and "application/json" in response.headers.get("content-type", "")
+    
     async def _get_shopify_policy_urls(self, domain: str) -> List[str]:
         """Get policy URLs for Shopify sites using known patterns + Playwright for JS content"""
         base_url = f"https://{domain}"
         
-        # Shopify canonical URLs (highest priority)
-        shopify_paths = [
-            '/policies/shipping-policy', '/policies/refund-policy', '/policies/return-policy',
-            '/policies/terms-of-service', '/policies/privacy-policy',
-            '/pages/shipping-policy', '/pages/shipping-information', '/pages/shipping',
-            '/pages/return-policy', '/pages/returns-exchanges', '/pages/returns',
-            '/pages/refund-policy', '/pages/exchange-policy',
-            '/pages/faq', '/pages/help', '/pages/customer-service'
-        ]
-        
-        # Quick test for existing URLs
-        valid_urls = []
-        for path in shopify_paths[:8]:  # Test top 8 only
+        async def probe(path: str) -> Optional[str]:
+            url = f"{base_url}{path}"
             try:
-                url = f"{base_url}{path}"
-                response = self.session.head(url, timeout=5)
+                response = await self._client.head(url, timeout=5, follow_redirects=False)
                 if response.status_code == 200:
-                    valid_urls.append(url)
-                    print(f"    ✅ Found Shopify page: {path}")
-                
-                import time
-                time.sleep(1.5)  # Faster for URL testing
-                
+                    logger.debug(f"    ✅ Found Shopify page: {path}")
+                    return url
             except Exception:
-                continue
+                pass
+            return None
         
-        return valid_urls
+        # Quick test for existing URLs, all in flight at once (order kept)
+        results = await asyncio.gather(*[probe(path) for path in SHOPIFY_POLICY_PATHS[:8]])  # Test top 8 only
+        return [url for url in results if url]
     
     async def _get_clean_content_playwright(self, url: str) -> Optional[str]:
-        """Extract clean content using Playwright (for ALL sites - no BeautifulSoup corruption)"""
+        """Extract clean content using Playwright (for ALL sites)"""
         try:
-            from playwright.async_api import async_playwright
+            from playwright.async_api import TimeoutError as PlaywrightTimeoutError
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
-                # Set realistic headers
-                await page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                })
+            # Borrow a context from the pool; up to CONTEXT_POOL_SIZE pages render at once
+            await self._get_browser()
+            context, uses = await self._acquire_context()
+            page = None
+            try:
+                page = await context.new_page()
                 
                 # Navigate and wait for content
                 await page.goto(url, timeout=15000, wait_until='domcontentloaded')
-                await page.wait_for_timeout(3000)  # Wait for JS to load content
+                try:
+                    # Return as soon as the network settles instead of a fixed 3s sleep
+                    await page.wait_for_load_state('networkidle', timeout=3000)
+                except PlaywrightTimeoutError:
+                    pass  # Long-polling pages never go idle; use what has rendered
                 
                 # Extract PERFECT clean text content
-                content = await page.evaluate('''() => {
-                    // Remove all problematic elements
-                    const elementsToRemove = document.querySelectorAll('script, style, nav, header, footer, aside, noscript');
-                    elementsToRemove.forEach(el => el.remove());
-                    
-                    // Get main content with priority selectors
-                    const selectors = [
-                        'main', '[role="main"]', '.main-content', '.content',
-                        '.policy-content', '.page-content', '.rte', '.shopify-policy__container',
-                        'article', '.article', '[class*="policy"]', '[class*="shipping"]', '[class*="return"]'
-                    ];
-                    
-                    let mainElement = null;
-                    for (const selector of selectors) {
-                        const element = document.querySelector(selector);
-                        if (element && element.innerText.length > 200) {
-                            mainElement = element;
-                            break;
-                        }
-                    }
-                    
-                    // Fallback to body
-                    const targetElement = mainElement || document.body;
-                    
-                    // Get clean text - no HTML, no corruption
-                    return targetElement.innerText || targetElement.textContent || '';
-                }''')
-                
-                await browser.close()
+                content = await page.evaluate(EXTRACT_TEXT_JS)
+            finally:
+                try:
+                    if page is not None:
+                        await page.close()
+                finally:
+                    await self._release_context(context, uses + 1)
+            
+            if content and len(content) > 100:
+                logger.debug(f"    ✅ Playwright extracted {len(content)} chars")
+                return content[:10000]
+            else:
+                logger.debug(f"    ⚠️ Playwright content too short: {len(content) if content else 0} chars")
+                return None
                 
-                if content and len(content) > 100:
-                    print(f"    ✅ Playwright extracted {len(content)} chars")
-                    return content[:10000]
-                else:
-                    print(f"    ⚠️ Playwright content too short: {len(content) if content else 0} chars")
-                    return None
-                    
         except Exception as e:
-            print(f"    ❌ Playwright error: {e}")
+            logger.warning(f"    ❌ Playwright error: {e}")
             return None
 
-    def _get_page_content_requests(self, url: str) -> Optional[str]:
-        """Get page content using requests + BeautifulSoup"""
+    async def _get_page_content_requests(self, url: str, reject_spa: bool = False) -> Optional[str]:
+        """Get page content using the async client + lxml"""
         try:
-            print(f"  📥 Fetching {url}...")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            logger.debug(f"  📥 Fetching {url}...")
+            # Stream the body and stop at MAX_PAGE_BYTES; policy text sits well within it
+            data = bytearray()
+            async with self._client.stream('GET', url, timeout=10) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    data.extend(chunk)
+                    if len(data) >= MAX_PAGE_BYTES:
+                        break
+            html = data.decode(response.encoding or 'utf-8', errors='replace')
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if reject_spa and _looks_like_spa(html):
+                logger.debug(f"  🧩 Client-rendered page, needs a browser")
+                return None
             
-            # SIMPLE AND EFFECTIVE cleaning (like the working version)
-            import re
+            # lxml parse + precompiled XPath, no CSS compiler
+            doc = lxml_html.document_fromstring(html.encode('utf-8'), parser=CONTENT_PARSER)
             
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
+            # Remove script/style/boilerplate elements (drop_tree keeps the tail text)
+            for element in STRIP_XPATH(doc):
+                element.drop_tree()
             
-            # Try to find main content area
+            # Try to find main content area in one walk: the substantial candidate from the
+            # highest-priority selector wins, earlier in the document on ties
             main_content = None
-            content_selectors = [
-                'main', '[role="main"]', '.main-content', '.content',
-                '.policy-content', '.page-content', '.rte', '.shopify-policy__container',
-                'article', '.article', '[class*="policy"]', '[class*="shipping"]', '[class*="return"]'
-            ]
-            
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    text = element.get_text(strip=True)
-                    if len(text) > 200:
-                        main_content = element
+            best_rank = len(CONTENT_SELECTORS)
+            for element in CONTENT_XPATH(doc):
+                rank = _selector_rank(element)
+                if rank < best_rank and len(''.join(t.strip() for t in element.itertext())) > 200:
+                    main_content, best_rank = element, rank
+                    if rank == 0:
                         break
-                if main_content:
-                    break
             
             # If no main content found, use body
-            if not main_content:
-                main_content = soup.body or soup
-            
-            # Extract text (SIMPLE approach like working version)
-            text = main_content.get_text(separator=' ', strip=True)
+            if main_content is None:
+                main_content = doc.find('body')
+                if main_content is None:
+                    main_content = doc
             
-            # Clean text (SIMPLE like working version)
-            text = re.sub(r'\s+', ' ', text)
-            text = text.strip()
+            # Extract text and collapse whitespace
+            text = WHITESPACE_RE.sub(' ', ' '.join(main_content.itertext())).strip()
             
             if len(text) > 50:
-                print(f"  ✅ Extracted {len(text)} chars")
+                logger.debug(f"  ✅ Extracted {len(text)} chars")
                 return text[:10000]  # Limit for performance
             else:
-                print(f"  ⚠️ Content too short: {len(text)} chars")
+                logger.debug(f"  ⚠️ Content too short: {len(text)} chars")
                 return None
                 
         except Exception as e:
-            print(f"  ❌ Error fetching {url}: {e}")
+            logger.warning(f"  ❌ Error fetching {url}: {e}")
             return None
@@ -1,30 +1,358 @@
 import asyncio
+import hashlib
+import random
 import re
-from urllib.parse import urlparse
-from typing import Dict, Optional
-import requests
-from bs4 import BeautifulSoup
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin, urlparse
+from typing import AsyncIterator, DefaultDict, Dict, List, Optional, Set, Tuple
+import ahocorasick
+import httpx
+from lxml import etree, html as lxml_html
 from playwright.async_api import async_playwright
 
+# Chromium flags for running headless inside containers
+BROWSER_ARGS = ['--disable-gpu', '--no-sandbox', '--disable-dev-shm-usage']
+
+# Link discovery only needs the DOM; never download these
+BLOCKED_RESOURCE_TYPES = frozenset(('image', 'font', 'media', 'stylesheet'))
+
+
+async def _block_heavy_resources(route):
+    """Playwright route handler: abort images/fonts/media/CSS, let the rest through"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# Transient failures are retried twice, 0.3s then 0.6s apart
+HTTP_RETRIES = 2
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+
+# Per-host politeness: concurrent requests and the jittered pause before each one (seconds)
+HOST_CONCURRENCY = 4
+HOST_DELAY_RANGE = (0.1, 0.2)
+
+# Bytes read per page before the body is cut off
+MAX_PAGE_BYTES = 512 * 1024
+
+# Guessed paths are checked with a short HEAD before any GET
+HEAD_TIMEOUT = 5.0
+HEAD_UNSUPPORTED_STATUSES = frozenset((405, 501))
+
+# Extracted page text is reused for a day; bounded so long-running workers stay small
+CONTENT_CACHE_TTL = 24 * 3600
+CONTENT_CACHE_SIZE = 512
+_content_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # normalized url -> (fetched_at, text)
+
+
+# Comments and PIs never carry page text. lxml parsers must not be shared between
+# threads and pages are parsed in the default executor, so each thread gets its own.
+_parser_local = threading.local()
+
+
+def _content_parser() -> lxml_html.HTMLParser:
+    """This thread's HTML parser"""
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = _parser_local.parser = lxml_html.HTMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+    return parser
+
+
+def _class_xpath(name: str) -> str:
+    """XPath equivalent of the CSS class selector .name"""
+    return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+
+# Main-content candidates in priority order, as (test, value) forms of the old CSS selector list
+_CONTENT_SELECTORS = (
+    ('tag', 'main'),             # main
+    ('role', 'main'),            # [role="main"]
+    ('class', 'main-content'),   # .main-content
+    ('class', 'content'),
+    ('class', 'policy'),
+    ('class', 'shipping'),
+    ('class', 'returns'),
+    ('class', 'faq'),
+    ('tag', 'article'),
+    ('class', 'page-content'),
+    ('id', 'content'),           # #content
+    ('class', 'container'),
+    ('class', 'wrapper'),
+    ('class', 'inner'),
+    ('class*', 'content'),       # [class*="content"]
+    ('class*', 'policy'),
+    ('class*', 'shipping'),
+    ('class*', 'return'),
+)
+
+
+def _selector_xpath(test: str, value: str) -> str:
+    """XPath for one _CONTENT_SELECTORS entry"""
+    if test == 'tag':
+        return f'//{value}'
+    if test == 'class':
+        return _class_xpath(value)
+    if test == 'class*':
+        return f"//*[contains(@class, '{value}')]"
+    return f"//*[@{test}='{value}']"
+
+
+def _selector_rank(element) -> int:
+    """Index of the first _CONTENT_SELECTORS entry the element matches"""
+    classes = element.get('class') or ''
+    tokens = classes.split()
+    for rank, (test, value) in enumerate(_CONTENT_SELECTORS):
+        if test == 'tag':
+            hit = element.tag == value
+        elif test == 'class':
+            hit = value in tokens
+        elif test == 'class*':
+            hit = value in classes
+        else:
+            hit = element.get(test) == value
+        if hit:
+            return rank
+    return len(_CONTENT_SELECTORS)
+
+
+# All candidates in one walk, returned in document order
+_CONTENT_XPATH = etree.XPath(' | '.join(_selector_xpath(test, value) for test, value in _CONTENT_SELECTORS))
+
+_STRIP_XPATH = etree.XPath('//script | //style | //nav | //header | //footer | //aside | //noscript')
+
+# Order numbers, dates and years are stripped before hashing page text
+_DIGIT_RE = re.compile(r'\d+')
+
+
+# Anchors worth categorizing: policy keywords in the link text or the resolved href
+_POLICY_RE = re.compile(r'shipping|delivery|return|refund|help|support|faq|policy|customer service')
+_POLICY_HREF_RE = re.compile(r'shipping|return|help|policy|faq')
+
+
+# Link categories in assignment order, with the keywords that put a link in each
+LINK_CATEGORIES = (
+    ('shipping', ('shipping', 'delivery')),
+    ('returns', ('return', 'refund')),
+    ('help', ('help', 'support', 'faq', 'customer')),
+)
+
+
+def _build_link_automaton() -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each link keyword to its category"""
+    automaton = ahocorasick.Automaton()
+    for category, keywords in LINK_CATEGORIES:
+        for keyword in keywords:
+            automaton.add_word(keyword, category)
+    automaton.make_automaton()
+    return automaton
+
+
+LINK_AUTOMATON = _build_link_automaton()
+
+
+def _collect_policy_links(html: str, page_url: str) -> List[Tuple[str, str]]:
+    """(absolute href, lowercased text) for every policy-looking <a href> in document order"""
+    doc = lxml_html.document_fromstring(html.encode('utf-8'), parser=_content_parser())
+    
+    # Resolve like the browser does, honouring <base href>
+    base = doc.find('.//base[@href]')
+    base_url = urljoin(page_url, base.get('href').strip()) if base is not None else page_url
+    
+    links = []
+    for anchor in doc.iter('a'):
+        href = anchor.get('href')
+        if href is None:
+            continue
+        href = urljoin(base_url, href.strip())
+        text = anchor.text_content().lower().strip()
+        if href and (_POLICY_RE.search(text) or _POLICY_HREF_RE.search(href)):
+            links.append((href, text))
+    return links
+
+
+def _categorize_links(links: List[Tuple[str, str]], base_url: str) -> Dict[str, str]:
+    """First same-site link per category among the first 15 candidates"""
+    policy_urls = {}
+    base_clean = base_url.rstrip('/')
+    for href, text in links[:15]:  # Limit to first 15 relevant links
+        
+        # Skip external links
+        if not href.startswith(base_clean):
+            continue
+        
+        # Categorize by priority; one scan finds every category the link mentions
+        categories = {category for _, category in LINK_AUTOMATON.iter(href.lower() + ' ' + text)}
+        for category, _ in LINK_CATEGORIES:
+            if category in categories and category not in policy_urls:
+                policy_urls[category] = href
+        
+        # Every slot filled; later links can't change the result
+        if len(policy_urls) == len(LINK_CATEGORIES):
+            break
+    return policy_urls
+
+
+# Common policy paths, grouped by the platform that serves them
+SHOPIFY_PATHS = (
+    '/pages/shipping',
+    '/pages/returns',
+    '/pages/shipping-returns',
+    '/pages/returns-exchanges',
+    '/pages/returns-exchanges-and-warranties',  # goodr.com specific!
+    '/pages/help',
+    '/pages/faq',
+    '/pages/shipping-policy',
+    '/pages/return-policy',
+    '/pages/delivery',
+    '/pages/customer-service',
+    '/pages/privacy-policy',
+)
+WOOCOMMERCE_PATHS = (
+    '/shipping-info',
+    '/return-info',
+    '/customer-care',
+    '/delivery-info',
+)
+GENERAL_PATHS = (
+    '/support/shipping',
+    '/support/returns',
+    '/info/shipping',
+    '/info/returns',
+    '/help/shipping',
+    '/help/returns',
+    '/en/shipping',
+    '/en/returns',
+    '/us/shipping',
+    '/us/returns',
+)
+
+# Probe order: the detected platform's paths first (earlier paths win a page type)
+DEFAULT_PATH_ORDER = SHOPIFY_PATHS + WOOCOMMERCE_PATHS + GENERAL_PATHS
+PLATFORM_PATH_ORDER = {
+    'shopify': SHOPIFY_PATHS + GENERAL_PATHS + WOOCOMMERCE_PATHS,
+    'woocommerce': WOOCOMMERCE_PATHS + GENERAL_PATHS + SHOPIFY_PATHS,
+}
+
+
+def _detect_platform(html: str) -> Optional[str]:
+    """Storefront platform from asset URLs in the main page HTML"""
+    if 'cdn.shopify.com' in html:
+        return 'shopify'
+    if 'wp-content/' in html:
+        return 'woocommerce'
+    return None
+
+
+def _extract_policy_links(html: str, base_url: str, page_url: Optional[str] = None) -> Dict[str, str]:
+    """Categorized same-site policy links found in a page's HTML"""
+    return _categorize_links(_collect_policy_links(html, page_url or base_url), base_url)
+
+
+def _content_digest(text: str) -> bytes:
+    """Short hash of page text with numbers and dates ignored"""
+    return hashlib.blake2b(_DIGIT_RE.sub('', text).encode('utf-8'), digest_size=8).digest()
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form for dedup: lowercase host without www., no query/fragment/trailing slash"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{parsed.scheme.lower()}://{host}{parsed.path.rstrip('/')}"
+
+
+def _extract_text(html: str) -> str:
+    """Whitespace-collapsed text of the page's main content area (pure CPU, thread-safe)"""
+    # Parse with lxml's C parser (comments/PIs dropped)
+    doc = lxml_html.document_fromstring(html.encode('utf-8'), parser=_content_parser())
+    
+    # Remove unwanted elements (drop_tree keeps the tail text)
+    for element in _STRIP_XPATH(doc):
+        element.drop_tree()
+    
+    # Try to find main content in one walk: the substantial candidate from the highest-priority
+    # selector wins, earlier in the document on ties (same pick as one query per selector)
+    main_content = None
+    best_rank = len(_CONTENT_SELECTORS)
+    for element in _CONTENT_XPATH(doc):
+        rank = _selector_rank(element)
+        if rank < best_rank and len(''.join(t.strip() for t in element.itertext())) > 200:
+            main_content, best_rank = element, rank
+            if rank == 0:
+                break
+    
+    # If no main content found, use body
+    if main_content is None:
+        main_content = doc.find('body')
+        if main_content is None:
+            main_content = doc
+    
+    # Extract text; str.split() collapses and trims whitespace in C, no regex pass
+    return ' '.join(' '.join(main_content.itertext()).split())
+
+
 class EcommerceScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.client: Optional[httpx.AsyncClient] = None
+        self._headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive'
-        })
+        }
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._seen: Set[str] = set()  # Normalized URLs already fetched in the current scrape
+        self._host_sems: DefaultDict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(HOST_CONCURRENCY))
+        self._content_hashes: Dict[bytes, Tuple[str, str]] = {}  # Text digest -> (page type, URL) first stored in the current scrape
         
     async def __aenter__(self):
+        # One pooled async client; HTTP/2 multiplexes same-origin probes over one connection
+        # (ALPN falls back to HTTP/1.1 when the server doesn't offer h2).
+        # The transport retries failed connects; _send retries transient statuses.
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=HTTP_RETRIES,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=30),
+        )
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            headers=self._headers,
+            timeout=httpx.Timeout(15.0),
+            follow_redirects=True,
+        )
+        self._browser_lock = asyncio.Lock()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        pass
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _get_browser(self):
+        """Launch the shared Chromium instance on first use"""
+        async with self._browser_lock:
+            if self._browser is None:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        return self._browser
 
     async def scrape_website(self, url: str) -> Dict:
-        """HYBRID scraper - combines requests + Playwright for best results"""
+        """HYBRID scraper - combines httpx + Playwright for best results"""
         domain = urlparse(url).netloc
         
         scraped_content = {
@@ -33,43 +361,69 @@ class EcommerceScraper:
             'policy_pages': {}
         }
         
+        # Per-scrape state; repeat fetches across scrapes are served by _content_cache
+        self._seen = set()
+        self._content_hashes = {}
+        
         try:
             print(f"🔍 Scraping {url}...")
             
-            # STEP 1: Get main page with requests (fast)
-            main_content = self._get_page_content_requests(url)
+            # STEP 1: Get main page over HTTP (fast); its raw HTML also reveals the platform
+            try:
+                main_html = await self._fetch_html(url)
+            except httpx.HTTPError as e:
+                print(f"  ❌ Request error for {url}: {e}")
+                main_html = None
+            platform = _detect_platform(main_html) if main_html else None
+            
+            main_content = await self._get_page_content_requests(url, html=main_html) if main_html else None
             if main_content:
+                self._earlier_page(main_content, 'main', url)
                 scraped_content['policy_pages']['main'] = {
                     'url': url,
                     'content': main_content
                 }
                 print(f"✅ Main page scraped: {len(main_content)} chars")
             
-            # STEP 2: Find real policy URLs using Playwright (for JS sites)
-            policy_urls = await self._find_policy_urls_playwright(url)
+            # STEP 2: Find policy URLs in the static HTML; Playwright only for JS-rendered sites
+            policy_urls = {}
+            if main_html:
+                policy_urls = await asyncio.get_running_loop().run_in_executor(
+                    None, _extract_policy_links, main_html, url
+                )
+            if len(policy_urls) < 2:
+                for page_type, page_url in (await self._find_policy_urls_playwright(url)).items():
+                    policy_urls.setdefault(page_type, page_url)
             print(f"🔗 Found {len(policy_urls)} policy URLs: {list(policy_urls.keys())}")
             
-            # STEP 3: Scrape policy pages with requests (fast)
-            for page_type, page_url in policy_urls.items():
-                try:
-                    content = self._get_page_content_requests(page_url)
-                    if content and len(content) > 100:
-                        scraped_content['policy_pages'][page_type] = {
-                            'url': page_url,
-                            'content': content
-                        }
-                        print(f"✅ Found {page_type} page: {len(content)} chars")
-                        
-                        # Stop after finding enough pages
-                        if len(scraped_content['policy_pages']) >= 4:
-                            break
-                except Exception as e:
-                    print(f"  ❌ Error scraping {page_url}: {e}")
+            # STEP 3: Scrape policy pages over HTTP (fast), all at once
+            results = await asyncio.gather(
+                *[self._get_page_content_requests(page_url) for page_url in policy_urls.values()],
+                return_exceptions=True
+            )
+            for (page_type, page_url), content in zip(policy_urls.items(), results):
+                if isinstance(content, Exception):
+                    print(f"  ❌ Error scraping {page_url}: {content}")
                     continue
+                if content and len(content) > 100:
+                    # Checked in policy_urls order, so the same page always keeps the text
+                    earlier = self._earlier_page(content, page_type, page_url)
+                    if earlier:
+                        print(f"  ♻️ {page_type} page has the same text as the {earlier[0]} page")
+                        content = f"Same content as the {earlier[0]} page ({earlier[1]})."
+                    scraped_content['policy_pages'][page_type] = {
+                        'url': page_url,
+                        'content': content
+                    }
+                    print(f"✅ Found {page_type} page: {len(content)} chars")
+                    
+                    # Stop after finding enough pages
+                    if len(scraped_content['policy_pages']) >= 4:
+                        break
             
             # STEP 4: Try common paths if still not enough content
             if len(scraped_content['policy_pages']) <= 2:
-                await self._try_common_paths(url, scraped_content)
+                await self._try_common_paths(url, scraped_content, platform)
             
             print(f"📄 Total pages scraped: {len(scraped_content['policy_pages'])}")
             
@@ -83,209 +437,166 @@ class EcommerceScraper:
         policy_urls = {}
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
-                # Set headers
-                await page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
+            # Cheap isolated context on the long-lived browser instead of a fresh launch
+            browser = await self._get_browser()
+            context = await browser.new_context(user_agent=self._headers['User-Agent'])
+            try:
+                page = await context.new_page()
+                await page.route("**/*", _block_heavy_resources)
                 
                 # Navigate with reasonable timeout
                 await page.goto(base_url, timeout=20000, wait_until='domcontentloaded')
                 
-                # Extract all links
-                links = await page.evaluate("""
-                    () => {
-                        const links = [];
-                        document.querySelectorAll('a[href]').forEach(link => {
-                            const href = link.href;
-                            const text = link.textContent.toLowerCase().trim();
-                            
-                            // Look for policy-related links
-                            if (href && (
-                                text.includes('shipping') ||
-                                text.includes('delivery') ||
-                                text.includes('return') ||
-                                text.includes('refund') ||
-                                text.includes('help') ||
-                                text.includes('support') ||
-                                text.includes('faq') ||
-                                text.includes('policy') ||
-                                text.includes('customer service') ||
-                                href.includes('shipping') ||
-                                href.includes('return') ||
-                                href.includes('help') ||
-                                href.includes('policy') ||
-                                href.includes('faq')
-                            )) {
-                                links.push({ href, text });
-                            }
-                        });
-                        return links;
-                    }
-                """)
-                
-                await browser.close()
-                
-                # Categorize links
-                for link in links[:15]:  # Limit to first 15 relevant links
-                    href = link['href']
-                    text = link['text']
-                    
-                    # Skip external links
-                    if not href.startswith(base_url.rstrip('/')):
-                        continue
-                    
-                    # Categorize by priority
-                    if any(keyword in text.lower() or keyword in href.lower() for keyword in ['shipping', 'delivery']):
-                        if 'shipping' not in policy_urls:
-                            policy_urls['shipping'] = href
-                    
-                    if any(keyword in text.lower() or keyword in href.lower() for keyword in ['return', 'refund']):
-                        if 'returns' not in policy_urls:
-                            policy_urls['returns'] = href
-                    
-                    if any(keyword in text.lower() or keyword in href.lower() for keyword in ['help', 'support', 'faq', 'customer']):
-                        if 'help' not in policy_urls:
-                            policy_urls['help'] = href
-                
+                # One CDP call for the rendered DOM; links are parsed in Python
+                html = await page.content()
+                page_url = page.url
+            finally:
+                await context.close()
+            
+            policy_urls = _extract_policy_links(html, base_url, page_url)
+            
         except Exception as e:
             print(f"  ⚠️ Playwright URL detection failed: {e}")
         
         return policy_urls
 
-    async def _try_common_paths(self, base_url: str, scraped_content: Dict):
-        """Try common policy paths if not enough content found"""
+    async def _try_common_paths(self, base_url: str, scraped_content: Dict, platform: Optional[str] = None):
+        """Try common policy paths if not enough content found, the platform's own paths first"""
         base_domain = base_url.rstrip('/')
+        common_paths = PLATFORM_PATH_ORDER.get(platform, DEFAULT_PATH_ORDER)
         
-        # Extended list of common paths (including goodr.com specific patterns)
-        common_paths = [
-            # Shopify patterns (most common)
-            '/pages/shipping',
-            '/pages/returns', 
-            '/pages/shipping-returns',
-            '/pages/returns-exchanges',
-            '/pages/returns-exchanges-and-warranties',  # goodr.com specific!
-            '/pages/help',
-            '/pages/faq',
-            '/pages/shipping-policy',
-            '/pages/return-policy',
-            '/pages/delivery',
-            '/pages/customer-service',
-            '/pages/privacy-policy',
-            
-            # WooCommerce patterns
-            '/shipping-info',
-            '/return-info',
-            '/customer-care',
-            '/delivery-info',
-            
-            # General patterns
-            '/support/shipping',
-            '/support/returns',
-            '/info/shipping',
-            '/info/returns',
-            '/help/shipping',
-            '/help/returns',
-            '/en/shipping',
-            '/en/returns',
-            '/us/shipping',
-            '/us/returns'
-        ]
-        
-        for path in common_paths:
-            test_url = base_domain + path
-            try:
-                content = self._get_page_content_requests(test_url)
-                if content and len(content) > 100:
-                    page_type = 'shipping' if 'shipping' in path.lower() else 'returns' if 'return' in path.lower() else 'help'
-                    
-                    # Only add if we don't already have this type
-                    if page_type not in scraped_content['policy_pages']:
-                        scraped_content['policy_pages'][page_type] = {
-                            'url': test_url,
-                            'content': content
-                        }
-                        print(f"✅ Found {page_type} via common path: {test_url}")
-                        
-                        if len(scraped_content['policy_pages']) >= 4:
-                            break
-            except Exception:
+        # Skip anything already fetched (e.g. found by Playwright), probe the rest concurrently
+        probes = [(path, base_domain + path) for path in common_paths]
+        probes = [(path, test_url) for path, test_url in probes if normalize_url(test_url) not in self._seen]
+        results = await asyncio.gather(
+            *[self._probe_path(test_url) for _, test_url in probes],
+            return_exceptions=True
+        )
+        for (path, test_url), content in zip(probes, results):
+            if isinstance(content, Exception):
                 continue
+            if content and len(content) > 100:
+                page_type = 'shipping' if 'shipping' in path.lower() else 'returns' if 'return' in path.lower() else 'help'
+                
+                # Only add if we don't already have this type
+                if page_type not in scraped_content['policy_pages']:
+                    # A guessed path serving text we already have is a soft 404 or an alias
+                    earlier = self._earlier_page(content, page_type, test_url)
+                    if earlier:
+                        print(f"  ♻️ {test_url} has the same text as the {earlier[0]} page, skipping")
+                        continue
+                    scraped_content['policy_pages'][page_type] = {
+                        'url': test_url,
+                        'content': content
+                    }
+                    print(f"✅ Found {page_type} via common path: {test_url}")
+                    
+                    if len(scraped_content['policy_pages']) >= 4:
+                        break
 
-    def _get_page_content_requests(self, url: str) -> Optional[str]:
-        """Get clean text content using requests + BeautifulSoup"""
-        try:
-            print(f"  📥 Fetching {url}...")
+    @asynccontextmanager
+    async def _send(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Stream a request, retrying rate-limit and gateway errors with backoff.
+        
+        The host's slot is held until the response is closed, so HOST_CONCURRENCY
+        caps whole transfers, not just the wait for headers.
+        """
+        host_sem = self._host_sems[urlparse(url).netloc.lower()]
+        for attempt in range(HTTP_RETRIES + 1):
+            request = self.client.build_request(method, url, **kwargs)
             
-            # Make request with longer timeout
-            response = self.session.get(url, timeout=45)
-            response.raise_for_status()
+            # Politeness: a few requests in flight per host, each after a short jittered pause
+            async with host_sem:
+                await asyncio.sleep(random.uniform(*HOST_DELAY_RANGE))
+                response = await self.client.send(request, stream=True)
+                try:
+                    if response.status_code not in RETRY_STATUSES or attempt == HTTP_RETRIES:
+                        yield response
+                        return
+                finally:
+                    await response.aclose()
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Back off without holding the slot
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    async def _probe_path(self, url: str) -> Optional[str]:
+        """HEAD a guessed path first so missing pages never cost a body download"""
+        if normalize_url(url) not in _content_cache:
+            try:
+                async with self._send('HEAD', url, timeout=HEAD_TIMEOUT) as response:
+                    status = response.status_code
+            except httpx.HTTPError:
+                return None
             
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'noscript']):
-                element.decompose()
+            # Servers that refuse HEAD get the benefit of the doubt
+            if status != 200 and status not in HEAD_UNSUPPORTED_STATUSES:
+                return None
+        
+        return await self._get_page_content_requests(url)
+
+    def _earlier_page(self, text: str, page_type: str, url: str) -> Optional[Tuple[str, str]]:
+        """(page type, URL) of a page stored earlier in this scrape with the same text at another URL, else None"""
+        first = self._content_hashes.setdefault(_content_digest(text), (page_type, url))
+        return first if normalize_url(first[1]) != normalize_url(url) else None
+
+    async def _fetch_html(self, url: str) -> Optional[str]:
+        """Download up to MAX_PAGE_BYTES of HTML; None for non-HTML responses, raises on HTTP errors"""
+        print(f"  📥 Fetching {url}...")
+        
+        # Stream the body and stop at MAX_PAGE_BYTES; policy text sits well within it
+        data = bytearray()
+        async with self._send('GET', url) as response:
+            response.raise_for_status()
             
-            # Try to find main content with better selectors
-            main_content = None
-            content_selectors = [
-                'main',
-                '[role="main"]',
-                '.main-content',
-                '.content',
-                '.policy',
-                '.shipping',
-                '.returns',
-                '.faq',
-                'article',
-                '.page-content',
-                '#content',
-                '.container',
-                '.wrapper',
-                '.inner',
-                '[class*="content"]',
-                '[class*="policy"]',
-                '[class*="shipping"]',
-                '[class*="return"]'
-            ]
+            # Images, PDFs, JSON etc. never yield policy text
+            content_type = response.headers.get('content-type', '')
+            if content_type and 'html' not in content_type.lower():
+                print(f"  ⏭️ Skipping non-HTML {content_type} for {url}")
+                return None
             
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    text = element.get_text(strip=True)
-                    if len(text) > 200:
-                        main_content = element
-                        break
-                if main_content:
+            async for chunk in response.aiter_bytes():
+                data.extend(chunk)
+                if len(data) >= MAX_PAGE_BYTES:
                     break
+        return data.decode(response.encoding or 'utf-8', errors='replace')
+
+    async def _get_page_content_requests(self, url: str, html: Optional[str] = None) -> Optional[str]:
+        """Get clean text content using the async client + lxml (or from already-fetched html)"""
+        norm = normalize_url(url)
+        self._seen.add(norm)
+        
+        if html is None:
+            cached = _content_cache.get(norm)
+            if cached and time.time() - cached[0] < CONTENT_CACHE_TTL:
+                _content_cache.move_to_end(norm)
+                print(f"  💾 Cache hit for {url}")
+                return cached[1]
+        
+        try:
+            if html is None:
+                html = await self._fetch_html(url)
+                if html is None:
+                    return None
             
-            # If no main content found, use body
-            if not main_content:
-                main_content = soup.body or soup
-            
-            # Extract text
-            text = main_content.get_text(separator=' ', strip=True)
-            
-            # Clean text
-            text = re.sub(r'\s+', ' ', text)
-            text = text.strip()
+            # Parsing is CPU-bound: run it off the event loop so concurrent fetches keep flowing
+            text = await asyncio.get_running_loop().run_in_executor(None, _extract_text, html)
             
             if len(text) > 50:
                 print(f"  ✅ Extracted {len(text)} chars")
-                return text[:10000]  # Increased limit for more content
+                text = text[:10000]  # Increased limit for more content
+                _content_cache[norm] = (time.time(), text)
+                _content_cache.move_to_end(norm)
+                if len(_content_cache) > CONTENT_CACHE_SIZE:
+                    _content_cache.popitem(last=False)
+                return text
             else:
                 print(f"  ⚠️ Content too short: {len(text)} chars")
                 return None
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             print(f"  ⏰ Timeout for {url}")
             return None
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"  ❌ Request error for {url}: {e}")
             return None
         except Exception as e: